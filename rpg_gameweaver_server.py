@@ -3,18 +3,35 @@
 RPG Game Master Web Server - Flask-based web interface for the RPG Game Weaver.
 Provides real-time interaction with a game master agent through text and voice.
 """
+# Eventlet must monkey-patch the stdlib before anything else imports it so
+# Socket.IO can multiplex clients on cooperative greenlets instead of one OS
+# thread each. Threading is left unpatched: the asyncio voice loop and
+# sounddevice callbacks need real OS threads.
+try:
+    import eventlet
+    import eventlet.wsgi
+    eventlet.monkey_patch(thread=False)
+    EVENTLET_AVAILABLE = True
+except ImportError:
+    print("Warning: eventlet not available. Falling back to threaded Socket.IO.")
+    EVENTLET_AVAILABLE = False
+
 import os
 import time
 import threading
+import functools
+import collections
 import asyncio
-import queue
 import re
 import random
+import string
 import sys
 import json
-import io # Moved standard imports to top
-import wave
-import base64
+import mmap
+import hashlib
+import struct
+import concurrent.futures
+from pathlib import Path
 
 from flask import Flask, render_template, request # Grouped third-party imports
 from flask_socketio import SocketIO, emit
@@ -38,6 +55,46 @@ except ImportError:
     print("Warning: sounddevice not available. Audio functionality will be limited.")
     SOUNDDEVICE_AVAILABLE = False
 
+# Default input samplerate, probed once: sd.query_devices walks every
+# PortAudio host API and can stall for tens of ms, so it should not run on
+# each voice pipeline start. Devices rarely change under a running server.
+DEFAULT_INPUT_SR = None
+if SOUNDDEVICE_AVAILABLE:
+    try:
+        DEFAULT_INPUT_SR = int(sd.query_devices(kind='input')['default_samplerate'])
+    except Exception:  # pylint: disable=broad-except
+        DEFAULT_INPUT_SR = None  # No input device at import; probe at start
+
+# Try to use orjson (C extension) for hot-path JSON, falling back to stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(obj):
+    """Serialize with orjson when available, stdlib json otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+def _json_loads(data):
+    """Deserialize with orjson when available, stdlib json otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+if ORJSON_AVAILABLE:
+    class _OrjsonSocketIO:
+        """Minimal json-module shim so Socket.IO frames serialize via orjson."""
+        @staticmethod
+        def dumps(obj, *_args, **_kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+
+        @staticmethod
+        def loads(data, *_args, **_kwargs):
+            return orjson.loads(data)
+
 # --- Agents SDK Imports ---
 from agents import (
     Agent,
@@ -59,7 +116,12 @@ from utils import file_utils, db_utils
 # Initialize and configure Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'morborg-gamemaster-secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode='eventlet' if EVENTLET_AVAILABLE else 'threading',
+    json=_OrjsonSocketIO if ORJSON_AVAILABLE else json
+)
 
 # Rich console for logging
 console = Console()
@@ -67,20 +129,32 @@ console = Console()
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
+# Initialize OpenAI client. The connectivity probe runs lazily on the first
+# command instead of at import time, so server startup never blocks on a
+# network round-trip.
 try:
     openai_api_key = os.getenv("OPENAI_API_KEY")
     if not openai_api_key:
         console.print("[bold red]Error: OPENAI_API_KEY not found in .env file.[/bold red]")
         sys.exit(1)
     openai_client = OpenAI(api_key=openai_api_key)  # Ensure OpenAI client is initialized correctly
-    # Test connection to OpenAI
-    openai_client.models.list()
-    console.print("[green]OpenAI client initialized.[/green]")
 except Exception as e:
     console.print(f"[bold red]Failed to initialize OpenAI client: {e}[/bold red]")
     sys.exit(1)
 
+_OPENAI_PROBED = threading.Event()
+
+def _ensure_openai_ready():
+    """Probe the OpenAI API once, the first time a command needs it."""
+    if _OPENAI_PROBED.is_set():
+        return
+    _OPENAI_PROBED.set()
+    try:
+        openai_client.models.list()
+        console.print("[green]OpenAI client initialized.[/green]")
+    except Exception as e:
+        console.print(f"[bold red]OpenAI connectivity check failed: {e}[/bold red]")
+
 # Initialize database
 try:
     game_db = db_utils.GameDatabase()
@@ -102,6 +176,9 @@ CURRENT_GAME_FILE = None
 AUDIO_RUNNING = False
 AUDIO_TASK = None
 WEB_CLIENTS = set()  # Track connected web clients
+# Connect/disconnect handlers can run on different threads when Socket.IO
+# falls back to async_mode='threading'; guard the set accordingly
+_WEB_CLIENTS_LOCK = threading.Lock()
 MAP_DATA = { # Keep this separate for potential Gemini generation cache
     "world_map": None,
     "local_areas": {},
@@ -122,6 +199,61 @@ except ImportError:
     console.print("[yellow]d20 library not available. Using basic dice rolling implementation.[/yellow]")
 
 # --- Helper Functions for Game Data (Moved Before Agent Definition) ---
+
+# The monster/item databases are persisted as JSONL and memory-mapped; the
+# indexes map casefolded name -> (offset, length) so a lookup is a dict hit
+# plus a zero-copy byte slice, with no per-call json.dumps. If the files
+# cannot be written/mapped, the indexes fall back to in-memory JSON strings.
+# Both files and indexes are rebuilt whenever the databases are regenerated.
+DATA_DIR = "data"
+_MONSTER_INDEX = {}
+_ITEM_INDEX = {}
+_MONSTER_MMAP = None
+_ITEM_MMAP = None
+
+def _persist_and_map(filename, records):
+    """Write records as JSONL, mmap the file, and index byte ranges by name."""
+    path = os.path.join(DATA_DIR, filename)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    lines = [_json_dumps(record) for record in records]
+    with open(path, 'w', encoding='utf-8') as file:
+        for line in lines:
+            file.write(line)
+            file.write("\n")
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    index = {}
+    offset = 0
+    for record, line in zip(records, lines):
+        encoded_length = len(line.encode('utf-8'))
+        index[record["name"].casefold()] = (offset, encoded_length)
+        offset += encoded_length + 1  # +1 for the newline
+    return mapped, index
+
+def _rebuild_monster_index():
+    """Persist the monster database and rebuild its mmap-backed index."""
+    global _MONSTER_INDEX, _MONSTER_MMAP
+    if _MONSTER_MMAP is not None:
+        _MONSTER_MMAP.close()
+        _MONSTER_MMAP = None
+    try:
+        _MONSTER_MMAP, _MONSTER_INDEX = _persist_and_map("monsters.jsonl", MONSTER_DATABASE)
+    except OSError as e:
+        console.print(f"[yellow]Could not persist monster database ({e}). Using in-memory index.[/yellow]")
+        _MONSTER_INDEX = {m["name"].casefold(): json.dumps(m, indent=2) for m in MONSTER_DATABASE}
+
+def _rebuild_item_index():
+    """Persist the item database and rebuild its mmap-backed index."""
+    global _ITEM_INDEX, _ITEM_MMAP
+    if _ITEM_MMAP is not None:
+        _ITEM_MMAP.close()
+        _ITEM_MMAP = None
+    try:
+        _ITEM_MMAP, _ITEM_INDEX = _persist_and_map("items.jsonl", ITEM_DATABASE)
+    except OSError as e:
+        console.print(f"[yellow]Could not persist item database ({e}). Using in-memory index.[/yellow]")
+        _ITEM_INDEX = {i["name"].casefold(): json.dumps(i, indent=2) for i in ITEM_DATABASE}
+
 def generate_monster_database():
     """Generate a basic monster database for the game."""
     global MONSTER_DATABASE
@@ -139,6 +271,7 @@ def generate_monster_database():
             "description": "A robed figure with ritual scars..."
         }
     ]
+    _rebuild_monster_index()
     console.print("[cyan]Generated default monster database.[/cyan]")
 
 def generate_item_database():
@@ -156,42 +289,78 @@ def generate_item_database():
             "description": "A yellowed parchment, script hurts eyes..."
         }
     ]
+    _rebuild_item_index()
     console.print("[cyan]Generated default item database.[/cyan]")
 
-# Ensure databases are populated on server start
-generate_monster_database()
-generate_item_database()
+# The databases are generated lazily on first lookup (see _lookup_monster /
+# _lookup_item) so cold start stays instant.
 
+def _lookup_monster(monster_name):
+    """Shared monster lookup used by the agent tool and the text command path."""
+    if not MONSTER_DATABASE: generate_monster_database()
+    entry = _MONSTER_INDEX.get(monster_name.casefold())
+    if entry is None:
+        return f"Monster '{monster_name}' not found."
+    if _MONSTER_MMAP is not None:
+        offset, length = entry
+        return _MONSTER_MMAP[offset:offset + length].decode('utf-8')
+    return entry # Pre-serialized JSON fallback
+
+def _lookup_item(item_name):
+    """Shared item lookup used by the agent tool and the text command path."""
+    if not ITEM_DATABASE: generate_item_database()
+    entry = _ITEM_INDEX.get(item_name.casefold())
+    if entry is None:
+        return f"Item '{item_name}' not found."
+    if _ITEM_MMAP is not None:
+        offset, length = entry
+        return _ITEM_MMAP[offset:offset + length].decode('utf-8')
+    return entry # Pre-serialized JSON fallback
+
+# Tools are async so the Agents SDK can dispatch several of them
+# concurrently on its event loop instead of serializing the calls
 @function_tool
-def lookup_monster(monster_name: str) -> str:
+async def lookup_monster(monster_name: str) -> str:
     """Look up a monster in the monster database by name."""
-    if not MONSTER_DATABASE: generate_monster_database()
-    for monster in MONSTER_DATABASE:
-        if monster["name"].lower() == monster_name.lower():
-            return json.dumps(monster, indent=2) # Return JSON for potential parsing
-    return f"Monster '{monster_name}' not found."
+    return _lookup_monster(monster_name)
 
 @function_tool
-def lookup_item(item_name: str) -> str:
+async def lookup_item(item_name: str) -> str:
     """Look up an item in the item database by name."""
-    if not ITEM_DATABASE: generate_item_database()
-    for item in ITEM_DATABASE:
-        if item["name"].lower() == item_name.lower():
-            return json.dumps(item, indent=2) # Return JSON
-    return f"Item '{item_name}' not found."
+    return _lookup_item(item_name)
 # --- End Helper Functions ---
 
-@function_tool
-def roll_dice_tool(dice_notation: str) -> str:
-    """
-    Rolls dice based on standard notation (e.g., 'd20', '2d6', '3d8+2') and returns the result as a string.
-    Supports advanced notation if d20 library is available, including 4d6kh3 (keep highest 3 of 4d6),
-    2d20kl1 (keep lowest 1, advantage), etc.
-    """
+# Compiled once at module scope; re.match would recompile-or-lookup per roll.
+_DICE_RE = re.compile(r'(\d+)?d(\d+)([+-]\d+)?')
+
+# Vectorized RNG for large rolls; below this many dice the plain
+# random.randint loop has lower overhead.
+_VECTORIZE_DICE_THRESHOLD = 8
+_RNG = np.random.default_rng() if NUMPY_AVAILABLE else None
+
+if D20_AVAILABLE:
+    @functools.lru_cache(maxsize=256)
+    def _parse_dice_notation(dice_notation):
+        """Parse dice notation into a d20 expression tree, cached per notation."""
+        return d20.parse(dice_notation)
+
+@functools.lru_cache(maxsize=256)
+def _parse_basic_notation(dice_notation):
+    """Parse basic 'NdS+M' notation into (num_dice, dice_size, modifier), cached."""
+    match = _DICE_RE.match(dice_notation)
+    if not match:
+        return None
+    num_dice = int(match.group(1)) if match.group(1) else 1
+    dice_size = int(match.group(2))
+    modifier = int(match.group(3)) if match.group(3) else 0
+    return num_dice, dice_size, modifier
+
+def _roll_dice(dice_notation):
+    """Shared dice roller used by the agent tool and the text command path."""
     if D20_AVAILABLE:
         try:
-            # Parse and roll the dice using d20 library
-            result = d20.roll(dice_notation)
+            # Roll from the cached expression tree; only the RNG step runs per call
+            result = d20.roll(_parse_dice_notation(dice_notation.strip()))
 
             # Format the response
             roll_str = str(result)
@@ -215,16 +384,20 @@ def roll_dice_tool(dice_notation: str) -> str:
 
     # Basic implementation using regex (fallback or if d20 not available)
     try:
-        match = re.match(r'(\d+)?d(\d+)([+-]\d+)?', dice_notation.strip())
-        if not match:
+        parsed = _parse_basic_notation(dice_notation.strip())
+        if parsed is None:
             return "Invalid dice notation. Use format like 'd20', '2d6', or '3d8+2'."
 
-        num_dice = int(match.group(1)) if match.group(1) else 1
-        dice_size = int(match.group(2))
-        modifier = int(match.group(3)) if match.group(3) else 0
+        num_dice, dice_size, modifier = parsed
 
-        rolls = [random.randint(1, dice_size) for _ in range(num_dice)]
-        total = sum(rolls) + modifier
+        if NUMPY_AVAILABLE and num_dice >= _VECTORIZE_DICE_THRESHOLD:
+            # Vectorized path: one numpy call instead of a Python-level loop
+            rolls_arr = _RNG.integers(1, dice_size + 1, size=num_dice, dtype=np.int32)
+            rolls = rolls_arr.tolist()
+            total = int(rolls_arr.sum()) + modifier
+        else:
+            rolls = [random.randint(1, dice_size) for _ in range(num_dice)]
+            total = sum(rolls) + modifier
 
         roll_details = f"Rolling {num_dice}d{dice_size}"
         if modifier:
@@ -248,36 +421,101 @@ def roll_dice_tool(dice_notation: str) -> str:
         console.print(f"[bold red]Error in dice rolling: {e}[/bold red]")
         return f"Error rolling dice: {str(e)}"
 
+@function_tool
+async def roll_dice_tool(dice_notation: str) -> str:
+    """
+    Rolls dice based on standard notation (e.g., 'd20', '2d6', '3d8+2') and returns the result as a string.
+    Supports advanced notation if d20 library is available, including 4d6kh3 (keep highest 3 of 4d6),
+    2d20kl1 (keep lowest 1, advantage), etc.
+    """
+    return _roll_dice(dice_notation)
+
+# Module-level like the other caches here, so it never rides along when
+# GAME_STATE is persisted to the database or the JSON backup
+_PLAYER_NAMES_CACHE = None
+
+def _player_names():
+    """Return the comma-joined player names, cached until players change."""
+    global _PLAYER_NAMES_CACHE
+    if _PLAYER_NAMES_CACHE is None:
+        _PLAYER_NAMES_CACHE = ', '.join(
+            [p.get('character_name', 'Unknown') for p in GAME_STATE.get('players', [])]
+        )
+    return _PLAYER_NAMES_CACHE
+
+def invalidate_player_names():
+    """Drop the cached player-name string; call after mutating players."""
+    global _PLAYER_NAMES_CACHE
+    _PLAYER_NAMES_CACHE = None
+
+# Cache for the generated system prompt. Rebuilding it queries the DB and
+# re-slices the game file on every agent turn; the inputs only change when a
+# game event is recorded or the game state/file changes.
+_HISTORY_VERSION = 0
+_PROMPT_CACHE_KEY = None
+_PROMPT_CACHE_TEXT = None
+
+# Rolling window of the most recent events mirrored in memory, with the
+# joined snippet recomputed only on append, so prompt builds never hit the
+# database. Seeded from the database at startup.
+_HISTORY_WINDOW = 10
+_HISTORY_DEQUE = collections.deque(maxlen=_HISTORY_WINDOW)
+_HISTORY_TEXT = ""
+
+def _refresh_history_text():
+    """Rebuild the pre-joined history snippet from the in-memory window."""
+    global _HISTORY_TEXT
+    _HISTORY_TEXT = "\n".join(f"{etype}: {desc}" for etype, desc in _HISTORY_DEQUE)
+
+def _seed_history_cache():
+    """Seed the in-memory history window from the database on startup."""
+    for event in game_db.get_game_history(_HISTORY_WINDOW):
+        _HISTORY_DEQUE.append((event['type'], event['description']))
+    _refresh_history_text()
+
+_seed_history_cache()
+
+def record_game_event(event_type, event_description, metadata=None):
+    """Add a game event and keep the in-memory history window in sync."""
+    global _HISTORY_VERSION
+    _HISTORY_VERSION += 1
+    _HISTORY_DEQUE.append((event_type, event_description))
+    _refresh_history_text()
+    return game_db.add_game_event(event_type, event_description, metadata)
+
 def get_system_prompt():
     """Generate the system prompt based on current game state."""
-    history = game_db.get_game_history(10)
-    history_text = "\n".join([f"{event['type']}: {event['description']}" for event in history])
+    global _PROMPT_CACHE_KEY, _PROMPT_CACHE_TEXT
+
     game_file_name = GAME_STATE.get('game_file', 'None')
     current_scene_name = GAME_STATE.get('current_scene', 'intro')
-    player_names = ', '.join([p.get('character_name', 'Unknown') for p in GAME_STATE.get('players', [])])
+    player_names = _player_names()
+
+    # Cheap key over everything the prompt depends on; return the cached
+    # prompt when nothing has changed since the last build.
+    cache_key = (
+        game_file_name, current_scene_name, player_names, _HISTORY_VERSION,
+        CURRENT_GAME_FILE.get("name") if CURRENT_GAME_FILE else None
+    )
+    if cache_key == _PROMPT_CACHE_KEY:
+        return _PROMPT_CACHE_TEXT
+
+    history_text = _HISTORY_TEXT  # Pre-joined in-memory window; no DB hit
 
     # Get relevant game content (if available)
     game_context = ""
     if CURRENT_GAME_FILE:
-        # If we have a game file loaded, include a snippet of it for context
+        # Use the excerpt precomputed at load time instead of re-slicing the
+        # (potentially very large) content string on every turn
         game_name = CURRENT_GAME_FILE.get("name", "None")
-
-        # If we need to examine the game file for relevant content based on the prompt
-        # We'll limit how much we send to avoid overwhelming the API
-        if "is_truncated" in CURRENT_GAME_FILE and CURRENT_GAME_FILE["is_truncated"]:
-            console.print("[cyan]Using truncated game content for system prompt[/cyan]")
-            game_content = CURRENT_GAME_FILE.get("content", "")
-        else:
-            game_content = CURRENT_GAME_FILE.get("content", "")
-
-        # Limit the game content included in the prompt to a reasonable size
-        max_context_length = 1000  # Characters - smaller for the system prompt
-        if len(game_content) > max_context_length:
-            game_context = f"\nGame file: {game_name} (truncated excerpt)\n{game_content[:max_context_length]}..."
+        excerpt = CURRENT_GAME_FILE.get("context_excerpt", CURRENT_GAME_FILE.get("content", ""))
+        if CURRENT_GAME_FILE.get("excerpt_is_partial"):
+            game_context = f"\nGame file: {game_name} (truncated excerpt)\n{excerpt}..."
         else:
-            game_context = f"\nGame file: {game_name}\n{game_content}"
+            game_context = f"\nGame file: {game_name}\n{excerpt}"
 
-    return f"""
+    _PROMPT_CACHE_KEY = cache_key
+    _PROMPT_CACHE_TEXT = f"""
     You are the Game Master for a Mörk Borg roleplaying game.
     Mörk Borg is a dark fantasy RPG with apocalyptic themes. Maintain a grim, atmospheric, and slightly menacing tone.
     Current game state: Game file: {game_file_name}, Current scene: {current_scene_name},
@@ -290,6 +528,7 @@ def get_system_prompt():
     Do not roll dice yourself.
     **Output Format:** Provide only the dialogue or narration directly. Example: `The air grows cold.`
     """
+    return _PROMPT_CACHE_TEXT
 
 game_master_agent = Agent(
     name="GameMaster",
@@ -346,15 +585,16 @@ def get_session_key():
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    WEB_CLIENTS.add(request.sid)
+    with _WEB_CLIENTS_LOCK:
+        WEB_CLIENTS.add(request.sid)
     emit('system', {'message': 'Connected to RPG Game Master'})
     console.print(f"[green]Web client connected: {request.sid}[/green]")
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    if request.sid in WEB_CLIENTS:
-        WEB_CLIENTS.remove(request.sid)
+    with _WEB_CLIENTS_LOCK:
+        WEB_CLIENTS.discard(request.sid)
     console.print(f"[yellow]Web client disconnected: {request.sid}[/yellow]")
 
 @socketio.on('command')
@@ -369,14 +609,22 @@ def handle_command(data):
 
     console.print(f"[cyan]Received command: {command}[/cyan]")
 
-    # Process the command
+    # Commands can block for seconds on OpenAI/DB calls; run them in a
+    # background task so the Socket.IO loop keeps serving other clients.
+    # The sid must be captured here - there is no request context in the task.
+    sid = request.sid
+    socketio.start_background_task(_run_command, sid, command, voice_settings)
+
+def _run_command(sid, command, voice_settings):
+    """Process a command off the Socket.IO handler and push the result."""
     try:
+        _ensure_openai_ready()
         response = process_web_command(command, voice_settings)
         if response:
-            emit('response', {'error': False, 'message': response})
+            socketio.emit('response', {'error': False, 'message': response}, to=sid)
     except Exception as e:
         console.print(f"[bold red]Error processing command: {e}[/bold red]")
-        emit('response', {'error': True, 'message': str(e)})
+        socketio.emit('response', {'error': True, 'message': str(e)}, to=sid)
 
 @socketio.on('get_map_data')
 def handle_get_map_data(data):
@@ -421,6 +669,28 @@ def handle_get_battle_state():
         console.print("[yellow]Request for battle state, but not in battle.[/yellow]")
         emit('system', {'message': 'Not currently in battle.'})
 
+# Debounce window for battle-state broadcasts; rapid UI actions (e.g. an HP
+# slider drag) coalesce into a single emit of the latest state
+BATTLE_BROADCAST_DEBOUNCE_S = 0.03
+_battle_broadcast_pending = False
+
+def _broadcast_battle_state():
+    """Emit the latest battle state once the debounce window closes."""
+    global _battle_broadcast_pending
+    socketio.sleep(BATTLE_BROADCAST_DEBOUNCE_S)
+    _battle_broadcast_pending = False
+    battle_state = GAME_STATE.get('battle_state')
+    if battle_state:
+        socketio.emit('battle_state_update', battle_state)
+
+def schedule_battle_broadcast():
+    """Schedule a debounced battle-state broadcast if one is not pending."""
+    global _battle_broadcast_pending
+    if _battle_broadcast_pending:
+        return
+    _battle_broadcast_pending = True
+    socketio.start_background_task(_broadcast_battle_state)
+
 @socketio.on('battle_action')
 def handle_battle_action(data):
     """Handle actions performed during battle (targeting, HP updates, etc.)."""
@@ -477,8 +747,8 @@ def handle_battle_action(data):
     if updated:
         # Store the updated battle state
         GAME_STATE['battle_state'] = battle_state
-        # Broadcast the updated state to all clients
-        socketio.emit('battle_state_update', battle_state)
+        # Broadcast to all clients, coalescing rapid updates into one emit
+        schedule_battle_broadcast()
         # Optionally save game state immediately after battle update
         # save_game_web()
 
@@ -532,69 +802,75 @@ def process_web_command(command, voice_settings=None):
     """Process commands from web interface"""
     command = command.lower().strip()
 
-    if command == "help":
-        return format_help_for_web()
-    if command == "start":
-        return start_game_web()
-    if command == "players":
-        return list_players_web()
-    if command == "games":
-        return load_game_files_web()
-    if command == "voice on":
-        start_audio_processing_web()
-        return "Attempting to start voice interaction..."
-    if command == "voice off":
-        stop_audio_processing_web()
-        return "Attempting to stop voice interaction..."
-    if command == "save":
-        return save_game_web()
-    if command == "history":
-        return show_game_history_web()
-    if command.startswith("roll "):
-        # Use the agent tool directly for text rolls
-        result = roll_dice_tool(command[5:])
-        return f"Roll Result: {result}"
-    if command.startswith("lookup monster "):
-        monster_name = command[15:].strip()
-        result = lookup_monster(monster_name)
-        # Try parsing JSON for better display, fallback to raw string
-        try:
-            monster_data = json.loads(result)
-            formatted_result = (
-                f"Monster: {monster_data['name']}\n"
-                f"Stats: STR {monster_data['str']}, AGI {monster_data['agi']}, "
-                f"PRE {monster_data['pre']}, TOU {monster_data['tou']}\n"
-                f"HP: {monster_data['hp']}, AC: {monster_data['ac']}\n"
-                f"Attacks: {', '.join(monster_data['attacks'])}\n"
-                f"Special: {monster_data['special']}\n"
-                f"Desc: {monster_data['description']}"
-            )
-            return formatted_result
-        except (json.JSONDecodeError, KeyError):
-            return result  # Return raw string if JSON parsing fails
-    if command.startswith("lookup item "):
-        item_name = command[12:].strip()
-        result = lookup_item(item_name)
-        try:
-            item_data = json.loads(result)
-            formatted_result = (
-                f"Item: {item_data['name']} ({item_data['type']})\n"
-                f"Value: {item_data['value']} silver\n"
-                f"Properties: {item_data['properties']}\n"
-                f"Desc: {item_data['description']}"
-            )
-            return formatted_result
-        except (json.JSONDecodeError, KeyError):
-            return result  # Return raw string if JSON parsing fails
-
-    # If not a system command, process as game input (text-based)
-    response = generate_game_response(command)
+    # Exact-match commands resolve with a single dict hit; prefix commands
+    # split the head token once instead of scanning with startswith chains
+    handler = _COMMANDS.get(command)
+    if handler:
+        return handler()
+
+    head, _, tail = command.partition(' ')
+    tail = tail.strip()
+    if head == "roll" and tail:
+        # Use the shared roller directly for text rolls
+        return f"Roll Result: {_roll_dice(tail)}"
+    if head == "lookup" and tail:
+        subject, _, name = tail.partition(' ')
+        name = name.strip()
+        if subject == "monster" and name:
+            return _format_monster_result(_lookup_monster(name))
+        if subject == "item" and name:
+            return _format_item_result(_lookup_item(name))
+
+    # If not a system command, process as game input (text-based).
+    # Sentences are streamed to clients as they complete, so only the
+    # end-of-stream marker is sent here instead of re-emitting the full text.
+    response = generate_game_response(command, stream_to_clients=True)
 
     # Add to game history for tracking
-    game_db.add_game_event("player_command", f"Player: {command}\nGM: {response}")
+    record_game_event("player_command", f"Player: {command}\nGM: {response}")
 
-    # Text-based commands generate response. TTS (Text-to-Speech) is handled by the pipeline.
-    return response
+    socketio.emit('response_complete', {'message': response})
+    return None
+
+def _format_monster_result(result):
+    """Format a monster lookup result for web display."""
+    # Try parsing JSON for better display, fallback to raw string
+    try:
+        monster_data = _json_loads(result)
+        return (
+            f"Monster: {monster_data['name']}\n"
+            f"Stats: STR {monster_data['str']}, AGI {monster_data['agi']}, "
+            f"PRE {monster_data['pre']}, TOU {monster_data['tou']}\n"
+            f"HP: {monster_data['hp']}, AC: {monster_data['ac']}\n"
+            f"Attacks: {', '.join(monster_data['attacks'])}\n"
+            f"Special: {monster_data['special']}\n"
+            f"Desc: {monster_data['description']}"
+        )
+    except (ValueError, KeyError):
+        return result  # Return raw string if JSON parsing fails
+
+def _format_item_result(result):
+    """Format an item lookup result for web display."""
+    try:
+        item_data = _json_loads(result)
+        return (
+            f"Item: {item_data['name']} ({item_data['type']})\n"
+            f"Value: {item_data['value']} silver\n"
+            f"Properties: {item_data['properties']}\n"
+            f"Desc: {item_data['description']}"
+        )
+    except (ValueError, KeyError):
+        return result  # Return raw string if JSON parsing fails
+
+def _voice_on_command():
+    """Enable voice interaction from the text command path."""
+    start_audio_processing_web()
+    return "Attempting to start voice interaction..."
+
+def _voice_off_command():
+    """Disable voice interaction from the text command path."""
+    stop_audio_processing_web()
+    return "Attempting to stop voice interaction..."
 
 def format_help_for_web():
     """Format help text for web display"""
@@ -636,6 +912,15 @@ def load_game_files_web():
 
     return games_list
 
+@functools.lru_cache(maxsize=8)
+def _cached_load_game_file(path, _mtime):
+    """Load a game file, cached by (path, mtime) so re-selections are O(1).
+
+    The mtime argument only serves as part of the cache key; it invalidates
+    the entry automatically when the file changes on disk.
+    """
+    return file_utils.load_game_file(path)
+
 def handle_game_selection(data, available_games):
     """Handle game file selection from web client"""
     selection = data.get('selection', '')
@@ -645,7 +930,11 @@ def handle_game_selection(data, available_games):
             selected_file = available_games[selection_int - 1]
             console.print(f"[bold green]Loading game file: {os.path.basename(selected_file)}[/bold green]")
 
-            game_content = file_utils.load_game_file(selected_file)
+            try:
+                file_mtime = os.path.getmtime(selected_file)
+            except OSError:
+                file_mtime = None
+            game_content = _cached_load_game_file(selected_file, file_mtime)
             if game_content is None:
                 emit('response', {
                     'error': True,
@@ -657,37 +946,35 @@ def handle_game_selection(data, available_games):
             content_length = len(game_content)
             console.print(f"[cyan]Game file size: {content_length} characters[/cyan]")
 
-            # For large files, we'll create a summarized version to use with audio
-            max_content_size = 250000  # 250k characters max for full content
+            # Large files are only flagged; the prompt paths read the
+            # precomputed excerpts below, so no truncated copy is kept
+            max_content_size = 250000  # 250k characters before flagging as large
+            max_excerpt_size = 1000  # Characters - smaller excerpt for the system prompt
+            max_response_excerpt = 2000  # Characters - excerpt for response generation
 
-            global CURRENT_GAME_FILE
-            if content_length > max_content_size:
-                console.print(f"[yellow]Game file is large ({content_length} chars). Creating summary for audio system.[/yellow]")
-                # Store full content for searching but use a truncated version for context
-                CURRENT_GAME_FILE = {
-                    "path": selected_file,
-                    "name": os.path.basename(selected_file),
-                    "content": game_content[:max_content_size],  # Truncated for system prompts
-                    "full_content": game_content,  # Full content available for specific searches
-                    "is_truncated": True
-                }
-
-                emit('response', {
-                    'error': False,
-                    'message': f"Game file loaded: {os.path.basename(selected_file)} ({content_length} characters, truncated for audio processing)"
-                })
-            else:
-                CURRENT_GAME_FILE = {
-                    "path": selected_file,
-                    "name": os.path.basename(selected_file),
-                    "content": game_content,
-                    "is_truncated": False
-                }
+            is_truncated = content_length > max_content_size
+            if is_truncated:
+                console.print(f"[yellow]Game file is large ({content_length} chars). Prompts will use excerpts.[/yellow]")
 
-                emit('response', {
-                    'error': False,
-                    'message': f"Game file loaded: {os.path.basename(selected_file)} ({content_length} characters)"
-                })
+            global CURRENT_GAME_FILE
+            # Excerpts are materialized once here so the per-turn prompt
+            # builders never re-slice the (potentially very large) content
+            CURRENT_GAME_FILE = {
+                "path": selected_file,
+                "name": os.path.basename(selected_file),
+                "content": game_content,  # Single full copy, used for searches
+                "is_truncated": is_truncated,
+                "context_excerpt": game_content[:max_excerpt_size],
+                "excerpt_is_partial": content_length > max_excerpt_size,
+                "response_excerpt": game_content[:max_response_excerpt],
+                "response_excerpt_is_partial": content_length > max_response_excerpt
+            }
+
+            truncation_note = ", truncated for audio processing" if is_truncated else ""
+            emit('response', {
+                'error': False,
+                'message': f"Game file loaded: {os.path.basename(selected_file)} ({content_length} characters{truncation_note})"
+            })
         else:
             emit('response', {'error': True, 'message': "Invalid selection. Please enter a number from the list."})
     except ValueError:
@@ -714,6 +1001,8 @@ def start_game_web():
     if not GAME_STATE:
         # Try to load from database
         GAME_STATE = check_existing_game_web()
+        # The loaded state may carry a different player roster
+        invalidate_player_names()
 
         # If still no game state, we need to set up a new game
         # For web, we'll return a message asking for players
@@ -726,7 +1015,7 @@ def start_game_web():
         intro = generate_game_response("Introduce the game and set the scene for the players.")
 
         # Add game start event
-        game_db.add_game_event("game_started", intro)
+        record_game_event("game_started", intro)
 
         return intro
 
@@ -764,67 +1053,167 @@ def show_game_history_web():
 
     return "No game history found."
 
-def generate_game_response(prompt):
-    """Generate a response from the Game Master using OpenAI"""
-    # Get recent game history for context
-    history = game_db.get_game_history(10)
-    history_text = "\n".join([f"{event['type']}: {event['description']}" for event in history])
-
-    # Get relevant game content (if available)
-    game_context = ""
-    if CURRENT_GAME_FILE:
-        # If we have a game file loaded, include a snippet of it for context
-        game_name = CURRENT_GAME_FILE.get("name", "None")
-
-        # If we need to examine the game file for relevant content based on the prompt
-        # We'll limit how much we send to avoid overwhelming the API
-        if "is_truncated" in CURRENT_GAME_FILE and CURRENT_GAME_FILE["is_truncated"]:
-            console.print("[cyan]Using truncated game content for response generation[/cyan]")
-            game_content = CURRENT_GAME_FILE.get("content", "")
-        else:
-            game_content = CURRENT_GAME_FILE.get("content", "")
-
-        # Limit the game content included in the prompt to a reasonable size
-        max_context_length = 2000  # Characters
-        if len(game_content) > max_context_length:
-            game_context = f"Game file: {game_name} (Note: Using a small excerpt of the game file due to size)\n\nExcerpt:\n{game_content[:max_context_length]}..."
-        else:
-            game_context = f"Game file: {game_name}\n\n{game_content}"
+# Exact-match command table; each command resolves with a single dict hit.
+# Defined after the handlers it references.
+_COMMANDS = {
+    "help": format_help_for_web,
+    "start": start_game_web,
+    "players": list_players_web,
+    "games": load_game_files_web,
+    "voice on": _voice_on_command,
+    "voice off": _voice_off_command,
+    "save": save_game_web,
+    "history": show_game_history_web,
+}
 
-    # Create system prompt with game context for OpenAI
-    system_prompt = f"""
+# Sentence boundary used to chunk streamed responses for the client
+_SENTENCE_END_RE = re.compile(r'[.!?](?:\s|$)')
+
+def _stream_game_response(messages):
+    """Stream the GM response from OpenAI, emitting each completed sentence."""
+    stream = openai_client.chat.completions.create(
+        model="gpt-4o",
+        messages=messages,
+        max_tokens=500,
+        stream=True
+    )
+
+    full_text = []
+    pending = ""
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        full_text.append(delta)
+        pending += delta
+        # Emit every completed sentence so the client can render (and speak)
+        # without waiting for the full response
+        match = _SENTENCE_END_RE.search(pending)
+        while match:
+            sentence = pending[:match.end()].strip()
+            pending = pending[match.end():]
+            if sentence:
+                socketio.emit('response_sentence', {'text': sentence})
+            match = _SENTENCE_END_RE.search(pending)
+
+    remainder = pending.strip()
+    if remainder:
+        socketio.emit('response_sentence', {'text': remainder})
+
+    return ''.join(full_text)
+
+# Static prefix of the GM system prompt. Kept byte-identical across turns
+# (and sent as the first message) so provider-side prompt caching can reuse
+# it; per-turn state travels in a second, dynamic system message.
+GM_STATIC_SYSTEM_PROMPT = """
     You are the Game Master for a Mörk Borg roleplaying game.
     Mörk Borg is a dark fantasy RPG with apocalyptic themes.
 
-    Current game state:
-    - Game file: {GAME_STATE.get('game_file', 'None')}
-    - Current scene: {GAME_STATE.get('current_scene', 'intro')}
-    - Players: {', '.join([p.get('character_name', 'Unknown') for p in GAME_STATE.get('players', [])])}
-
-    Recent game history:
-    {history_text}
-
-    {game_context if game_context else ""}
-
     Respond as a descriptive, atmospheric game master. Be concise yet vivid.
     Create dramatic and immersive narratives. When appropriate, call for dice rolls.
 
     **Output Format:** Provide only the dialogue or narration directly. Example: `The crypt door creaks open.`
     """
 
+# Pre-compiled at import so each turn only substitutes values instead of
+# re-parsing a multi-KB f-string
+GM_DYNAMIC_PROMPT_TEMPLATE = string.Template("""
+    Current game state:
+    - Game file: $game_file
+    - Current scene: $scene
+    - Players: $players_csv
+
+    Recent game history:
+    $history_text
+
+    $game_context
+    """)
+
+# Recent GM responses keyed by a content hash of the prompt plus everything
+# the prompt build depends on. A hit means the model would see byte-identical
+# input, so the reply is served without a round trip or token spend.
+_GM_RESPONSE_CACHE = collections.OrderedDict()
+_GM_RESPONSE_CACHE_MAX = 256
+
+def _gm_cache_key(prompt):
+    """Hash the prompt together with all per-turn context it is built from."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (
+        prompt,
+        str(GAME_STATE.get('game_file', 'None')),
+        str(GAME_STATE.get('current_scene', 'intro')),
+        _player_names(),
+        _HISTORY_TEXT,
+        CURRENT_GAME_FILE.get("name", "") if CURRENT_GAME_FILE else ""
+    ):
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\x00')
+    return hasher.hexdigest()
+
+def generate_game_response(prompt, stream_to_clients=False, cache=True):
+    """Generate a response from the Game Master using OpenAI"""
+    # Identical (prompt, game context) pairs resolve from the cache; pass
+    # cache=False to force a fresh generation
+    cache_key = _gm_cache_key(prompt)
+    if cache:
+        cached = _GM_RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            _GM_RESPONSE_CACHE.move_to_end(cache_key)
+            console.print("[grey50]GM response served from cache.[/grey50]")
+            if stream_to_clients:
+                socketio.emit('response_sentence', {'text': cached})
+            return cached
+
+    # Recent history comes from the in-memory window kept in sync by
+    # record_game_event; no database round-trip per turn
+    history_text = _HISTORY_TEXT
+
+    # Get relevant game content (if available)
+    game_context = ""
+    if CURRENT_GAME_FILE:
+        # Use the excerpt materialized at load time; no re-slicing per turn
+        game_name = CURRENT_GAME_FILE.get("name", "None")
+        excerpt = CURRENT_GAME_FILE.get("response_excerpt", CURRENT_GAME_FILE.get("content", ""))
+        if CURRENT_GAME_FILE.get("response_excerpt_is_partial"):
+            game_context = f"Game file: {game_name} (Note: Using a small excerpt of the game file due to size)\n\nExcerpt:\n{excerpt}..."
+        else:
+            game_context = f"Game file: {game_name}\n\n{excerpt}"
+
+    # Per-turn context only; everything invariant lives in the static prefix
+    dynamic_prompt = GM_DYNAMIC_PROMPT_TEMPLATE.substitute(
+        game_file=GAME_STATE.get('game_file', 'None'),
+        scene=GAME_STATE.get('current_scene', 'intro'),
+        players_csv=_player_names(),
+        history_text=history_text,
+        game_context=game_context
+    )
+
+    messages = [
+        {"role": "system", "content": GM_STATIC_SYSTEM_PROMPT},
+        {"role": "system", "content": dynamic_prompt},
+        {"role": "user", "content": prompt}
+    ]
+
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",  # Using gpt-4o for potentially better instruction following
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500
-        )
-        return response.choices[0].message.content
+        if stream_to_clients:
+            text = _stream_game_response(messages)
+        else:
+            response = openai_client.chat.completions.create(
+                model="gpt-4o",  # Using gpt-4o for potentially better instruction following
+                messages=messages,
+                max_tokens=500
+            )
+            text = response.choices[0].message.content
+        _GM_RESPONSE_CACHE[cache_key] = text
+        while len(_GM_RESPONSE_CACHE) > _GM_RESPONSE_CACHE_MAX:
+            _GM_RESPONSE_CACHE.popitem(last=False)
+        return text
     except Exception as e:
         console.print(f"[bold red]Error generating response: {e}[/bold red]")
-        return "The Game Master pauses for a moment, lost in thought..."
+        fallback = "The Game Master pauses for a moment, lost in thought..."
+        if stream_to_clients:
+            socketio.emit('response_sentence', {'text': fallback})
+        return fallback
 
 # --- New Async Audio Processing for Web Server ---
 ASYNC_LOOP = None  # Global asyncio loop
@@ -838,29 +1227,178 @@ def run_async_loop():
     ASYNC_LOOP.run_forever()
     console.print("[cyan]Asyncio event loop stopped.[/cyan]")
 
-    # Create a queue for audio data processing
-web_audio_queue = queue.Queue()
+# Pre-allocated single-producer/single-consumer ring buffer between the
+# PortAudio callback (producer) and the pipeline feeder (consumer). Only the
+# callback advances the head and only the feeder advances the tail; CPython
+# single-word writes are atomic under the GIL, so the real-time callback
+# never takes a lock and never allocates after the first frame.
+AUDIO_RING_SLOTS = 64  # Power of two so a mask replaces the modulo
+_RING_MASK = AUDIO_RING_SLOTS - 1
+# Fixed callback block size passed to InputStream: with the default
+# blocksize=0 PortAudio may vary the frame count between callbacks, and a
+# varying shape would force ring reallocation mid-stream
+AUDIO_BLOCK_FRAMES = 1024
+_ring_buffer = None
+_ring_head = 0  # Next slot the producer writes
+_ring_tail = 0  # Next slot the consumer reads
+_ring_event = None  # asyncio.Event; set on the loop when frames arrive
+
+def _ring_reset():
+    """Reset the ring indexes before a new pipeline run."""
+    global _ring_head, _ring_tail
+    _ring_head = 0
+    _ring_tail = 0
+
+def _ring_wake_consumer():
+    """Wake the feeder coroutine; runs on the asyncio loop thread."""
+    if _ring_event is not None:
+        _ring_event.set()
+
+def _ring_store(indata):
+    """Copy a microphone frame into the next ring slot (producer side)."""
+    global _ring_buffer, _ring_head, _ring_tail
+    if _ring_buffer is None or _ring_buffer.shape[1:] != indata.shape:
+        # Allocated once, on the first callback, when the block shape is
+        # known. The stream is opened with a fixed blocksize, so a shape
+        # change mid-stream should not happen; if it somehow does, drop the
+        # pending slots too — their indexes point into the old buffer
+        _ring_buffer = np.empty((AUDIO_RING_SLOTS,) + indata.shape, dtype=indata.dtype)
+        _ring_head = 0
+        _ring_tail = 0
+    if _ring_head - _ring_tail >= AUDIO_RING_SLOTS:
+        return  # Ring full: drop the frame rather than stall the RT thread
+    np.copyto(_ring_buffer[_ring_head & _RING_MASK], indata)
+    _ring_head += 1
+    # Always schedule a wake: an empty-transition check here races with the
+    # feeder parking between its drain and its wait (the feeder could see
+    # the old head, park, and never be woken again). One coalescing
+    # Event.set per audio block is cheap insurance against that stall.
+    if ASYNC_LOOP is not None:
+        ASYNC_LOOP.call_soon_threadsafe(_ring_wake_consumer)
 
 async def process_audio_queue(input_stream):
-    """Process audio data from the queue and feed it to the input stream."""
-    # No need for global declaration as we're only reading AUDIO_RUNNING status
+    """Feed ring-buffered microphone audio into the pipeline input stream."""
+    global _ring_tail, _ring_event
+    _ring_event = asyncio.Event()
     try:
         while AUDIO_RUNNING:
-            try:
-                # Get audio from the queue with a timeout (non-blocking)
-                audio_data = web_audio_queue.get(block=True, timeout=0.1)
-                # Feed it to the input stream
-                await input_stream.add_audio(audio_data)
-                # Mark task as done
-                web_audio_queue.task_done()
-            except queue.Empty:
-                # No audio data in the queue, just wait a bit
-                await asyncio.sleep(0.01)
+            while _ring_tail < _ring_head:
+                # Hand the pipeline a view of the ring slot: no allocation or
+                # memcpy per frame. The slot is not rewritten until the head
+                # wraps all the way around, which gives the STT several
+                # hundred ms to consume the frame before reuse.
+                frame = _ring_buffer[_ring_tail & _RING_MASK]
+                await input_stream.add_audio(frame)
+                _ring_tail += 1
+            _ring_event.clear()
+            if _ring_tail < _ring_head:
+                continue  # A frame landed between the drain and the clear
+            # Woken by the callback when audio arrives, or by shutdown; the
+            # loop condition re-checks AUDIO_RUNNING after every wake
+            await _ring_event.wait()
     except asyncio.CancelledError:
         console.print("[yellow]Web audio processing task cancelled.[/yellow]")
     except Exception as e:
         console.print(f"[bold red]Error in web audio processing task: {e}[/bold red]")
 
+# Two-phase TTS emit: flush this many chunks immediately for minimal
+# time-to-first-audio, then batch PCM up to the flush size before emitting.
+TTS_FIRST_PHASE_CHUNKS = 5
+TTS_STEADY_FLUSH_BYTES = 32 * 1024
+
+# Hann-window crossfade between consecutive TTS chunks; removes audible pops
+# at chunk boundaries without padding silence (which would add latency)
+_CROSSFADE_SAMPLES = 512
+if NUMPY_AVAILABLE:
+    _FADE_OUT = 0.5 * (1 + np.cos(np.pi * np.linspace(0, 1, _CROSSFADE_SAMPLES)))
+    _FADE_IN = 1.0 - _FADE_OUT
+
+def _crossfade_chunk(audio_int16, prev_tail):
+    """Blend a chunk's head against the previous chunk's tail with a Hann window.
+
+    Returns the (possibly modified) chunk and the new tail to carry forward.
+    Requires numpy; callers should pass through unchanged when it is missing.
+    """
+    samples = audio_int16.reshape(-1)
+    if samples.size < _CROSSFADE_SAMPLES:
+        return audio_int16, prev_tail
+    if prev_tail is not None:
+        head = samples[:_CROSSFADE_SAMPLES].astype(np.float32)
+        blended = prev_tail * _FADE_OUT + head * _FADE_IN
+        samples = samples.copy()
+        samples[:_CROSSFADE_SAMPLES] = blended.astype(np.int16)
+    new_tail = samples[-_CROSSFADE_SAMPLES:].astype(np.float32)
+    return samples, new_tail
+
+TTS_SAMPLE_RATE = 22050  # 22.05kHz mono int16 from the voice pipeline
+
+# Canonical 44-byte WAV header packed once at import: RIFF/data sizes carry
+# the streaming sentinel since the total length is unknown up front. This
+# replaces a wave.open round trip through BytesIO for a fixed-format stream.
+_WAV_STREAM_HEADER = struct.pack(
+    '<4sI4s4sIHHIIHH4sI',
+    b'RIFF', 0xFFFFFFFF, b'WAVE',
+    b'fmt ', 16,            # fmt chunk size
+    1,                      # PCM
+    1,                      # Mono
+    TTS_SAMPLE_RATE,
+    TTS_SAMPLE_RATE * 2,    # Byte rate (16-bit mono)
+    2,                      # Block align
+    16,                     # Bits per sample
+    b'data', 0xFFFFFFFF
+)
+
+def _emit_audio_header():
+    """Announce the PCM stream format to clients, once per pipeline run."""
+    if not WEB_CLIENTS:
+        return  # No browser attached; nothing to describe the stream to
+    socketio.emit('audio_header', {
+        'header': _WAV_STREAM_HEADER,
+        'format': 'pcm_s16le',
+        'sample_rate': TTS_SAMPLE_RATE,
+        'channels': 1
+    })
+
+# Audio emits run off the asyncio loop: Socket.IO serialization and framing
+# would otherwise block the voice pipeline's event stream. One worker, not
+# several, because PCM chunks must reach clients in order.
+ENCODE_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="audio-emit"
+)
+
+# Temp-file deletion runs off the pipeline coroutine: unlink is a blocking
+# filesystem call, so turn boundaries hand the batch to one worker thread
+_CLEANUP_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="tmp-cleanup"
+)
+
+def _delete_temp_files(paths):
+    """Queue temp audio files for deletion on the cleanup worker."""
+    if not paths:
+        return
+    batch = list(paths)
+
+    def _unlink_batch():
+        for f_path in batch:
+            try:
+                Path(f_path).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    _CLEANUP_POOL.submit(_unlink_batch)
+
+def _emit_pcm_chunk(audio_bytes):
+    """Emit raw little-endian int16 PCM as a single binary Socket.IO frame.
+
+    No per-chunk WAV container or base64: the header describing the stream
+    was already sent via _emit_audio_header, so each chunk is one memcpy
+    onto the wire. Skipped entirely when no browser is connected, since
+    serializing and framing audio nobody receives is pure waste.
+    """
+    if not WEB_CLIENTS:
+        return
+    socketio.emit('audio_pcm', audio_bytes)
+
 async def run_voice_pipeline_web():
     """Runs the voice pipeline, emitting events via SocketIO."""
     global AUDIO_RUNNING
@@ -875,6 +1413,12 @@ async def run_voice_pipeline_web():
     # Force audio context resume in browser for audio processing
     socketio.emit('audio_init', {'message': 'Initialize audio context'})
 
+    # Describe the PCM stream once up front; every chunk after this is raw
+    _emit_audio_header()
+
+    # Start each run with an empty ring
+    _ring_reset()
+
     input_stream = StreamedAudioInput()
 
     def audio_callback(indata, _frames, _time, status):
@@ -882,19 +1426,48 @@ async def run_voice_pipeline_web():
         if status:
             console.print(f"[yellow]Audio Callback Status: {status}[/yellow]")
         if AUDIO_RUNNING:
-            # Put the audio in the queue instead of calling the coroutine directly
-            web_audio_queue.put(indata.copy())
+            # Copy into a pre-allocated ring slot; no locks, no allocation
+            _ring_store(indata)
         # When AUDIO_RUNNING is False, we simply stop adding audio
         # No explicit stream closing needed in the callback
 
-    samplerate = sd.query_devices(kind='input')['default_samplerate']
-    stream = sd.InputStream(samplerate=samplerate, channels=1, dtype='int16', callback=audio_callback)
+    # Use the samplerate probed at import; only re-query if that failed
+    samplerate = DEFAULT_INPUT_SR or sd.query_devices(kind='input')['default_samplerate']
+    # Fixed blocksize keeps every callback the same shape, so the ring is
+    # allocated exactly once (blocksize=0 lets PortAudio vary the count)
+    stream = sd.InputStream(samplerate=samplerate, channels=1, dtype='int16',
+                            blocksize=AUDIO_BLOCK_FRAMES, callback=audio_callback)
 
     # Create and track the audio processing task
     processor_task = asyncio.create_task(process_audio_queue(input_stream))
 
     temp_audio_files = []  # Keep track of temp files to delete
 
+    # Two-phase emit state for this pipeline run
+    pending_pcm = bytearray()
+    tts_chunks_emitted = 0
+    fade_tail = None  # Tail samples of the previous chunk for crossfading
+    audio_frame_count = 0  # Gates the per-chunk debug prints
+    to_int16 = None  # Converter closure, chosen once from the first chunk's dtype
+
+    # Hot-loop callables bound as locals: the audio branch runs per TTS
+    # chunk, and LOAD_FAST beats a global plus attribute lookup each time.
+    # (The in-loop import statements that used to sit here were already
+    # hoisted to the module top.)
+    crossfade = _crossfade_chunk
+    submit_emit = ENCODE_POOL.submit
+    emit_pcm = _emit_pcm_chunk
+
+    def _pick_converter(sample):
+        """Choose the dtype conversion once; every chunk in a run shares it."""
+        if sample.dtype == np.int16:
+            return lambda data: data
+        console.print(f"[yellow]Converting audio from {sample.dtype} to int16[/yellow]")
+        if np.issubdtype(sample.dtype, np.floating):
+            # Float data is scaled (-1.0 to 1.0 -> -32768 to 32767)
+            return lambda data: (data * 32767).astype(np.int16)
+        return lambda data: data.astype(np.int16)
+
     try:
         stream.start()
         console.print("[green]Microphone stream started (web). Listening...[/green]")
@@ -912,24 +1485,18 @@ async def run_voice_pipeline_web():
             if event.type == "voice_stream_event_audio":
                 # Convert numpy array to bytes with better browser compatibility
                 if NUMPY_AVAILABLE:
-                    console.print(
-                        f"[cyan]Audio event received, data shape: {event.data.shape}, "
-                        f"dtype: {event.data.dtype}[/cyan]"
-                    )
+                    if audio_frame_count % 64 == 0:
+                        console.print(
+                            f"[cyan]Audio event received, data shape: {event.data.shape}, "
+                            f"dtype: {event.data.dtype}[/cyan]"
+                        )
 
                     try:
-                        # Make sure it's int16 format as expected by our client
-                        if event.data.dtype != np.int16:
-                            console.print(f"[yellow]Converting audio from {event.data.dtype} to int16[/yellow]")
-                            # Scale and convert to int16
-                            if np.issubdtype(event.data.dtype, np.floating):
-                                # If float data, scale appropriately (-1.0 to 1.0 -> -32768 to 32767)
-                                audio_int16 = (event.data * 32767).astype(np.int16)
-                            else:
-                                # For other integer types
-                                audio_int16 = event.data.astype(np.int16)
-                        else:
-                            audio_int16 = event.data
+                        # The pipeline's output dtype is stable for a run, so
+                        # inspect the first chunk and reuse the converter
+                        if to_int16 is None:
+                            to_int16 = _pick_converter(event.data)
+                        audio_int16 = to_int16(event.data)
                     except Exception as audio_err:
                         console.print(f"[bold red]Error processing audio: {audio_err}[/bold red]")
                         audio_int16 = event.data  # Use original data as fallback
@@ -939,48 +1506,33 @@ async def run_voice_pipeline_web():
 
                 # Process and send audio data
                 try:
-                    # Create a WAV file in memory for better browser compatibility
-                    import io
-                    import wave
-                    import base64
-
     # Check if we have numpy or need to use raw data for audio processing
                     if NUMPY_AVAILABLE:
-                        audio_bytes = audio_int16.tobytes()
+                        # Crossfade against the previous chunk's tail to avoid pops
+                        audio_int16, fade_tail = crossfade(audio_int16, fade_tail)
+                        # Cast memoryview: the bytearray below reads the
+                        # samples in place, where tobytes() would first
+                        # materialize a throwaway copy of the whole chunk
+                        audio_bytes = memoryview(audio_int16).cast('B')
                     else:
                         audio_bytes = event.data.tobytes() if hasattr(event.data, 'tobytes') else event.data
 
-                    # Create a WAV file in memory
-                    buffer = io.BytesIO()
-                    with wave.open(buffer, 'wb') as wav_file:
-    # pylint: disable=no-member for wave file writing
-                        wav_file.setnchannels(1)  # Mono
-                        wav_file.setsampwidth(2)  # 16-bit
-                        wav_file.setframerate(22050)  # 22.05kHz
-                        wav_file.writeframes(audio_bytes)
-    # pylint: enable=no-member after wave file writing
-
-                    # Get the WAV bytes
-                    buffer.seek(0)
-                    wav_bytes = buffer.read()
-
-                    # Base64 encode for reliable transport through Socket.IO
-                    b64_encoded = base64.b64encode(wav_bytes).decode('utf-8')
-
-                    console.print("[cyan]Sending WAV audio to client (base64 encoded)[/cyan]")
-
-                    # Send properly formatted audio to client
-                    socketio.emit('audio_chunk', {
-                        'audio': b64_encoded,
-                        'format': 'wav',
-                        'encoding': 'base64'
-                    })
-
-    # Debug output to help troubleshoot browser audio issues for audio processing
-                    if NUMPY_AVAILABLE:
+                    # Two-phase emit: flush the first few chunks immediately so
+                    # the player hears audio as soon as possible, then coalesce
+                    # chunks into larger batches to cut per-emit overhead
+                    pending_pcm += audio_bytes
+                    if tts_chunks_emitted < TTS_FIRST_PHASE_CHUNKS or len(pending_pcm) >= TTS_STEADY_FLUSH_BYTES:
+                        submit_emit(emit_pcm, bytes(pending_pcm))
+                        pending_pcm.clear()
+                        tts_chunks_emitted += 1
+
+    # Debug output to help troubleshoot browser audio issues; sampled every
+    # 64th chunk because the min/max reductions scan the whole buffer
+                    if NUMPY_AVAILABLE and audio_frame_count % 64 == 0:
                         audio_min = np.min(audio_int16)
                         audio_max = np.max(audio_int16)
                         console.print(f"[cyan]Audio range: {audio_min} to {audio_max}[/cyan]")
+                    audio_frame_count += 1
 
                 except Exception as audio_err:
                     console.print(f"[bold red]Error processing audio for client: {audio_err}[/bold red]")
@@ -989,40 +1541,47 @@ async def run_voice_pipeline_web():
                 console.print(f"[grey50]Web Lifecycle Event: {event.lifecycle_event}[/grey50]")
                 socketio.emit('lifecycle_event', {'event': event.lifecycle_event})
                 if event.lifecycle_event == "turn_ended":
+                    # Flush any batched audio before the turn closes
+                    if pending_pcm:
+                        ENCODE_POOL.submit(_emit_pcm_chunk, bytes(pending_pcm))
+                        pending_pcm.clear()
+                    tts_chunks_emitted = 0
+                    fade_tail = None
                     # Clean up any temp files created for this turn
-                    for f_path in temp_audio_files:
-                        try:
-                            os.remove(f_path)
-                        except OSError:
-                            pass
+                    _delete_temp_files(temp_audio_files)
                     temp_audio_files.clear()
 
             elif event.type == "voice_stream_event_transcription":
                 console.print(f"[bold cyan]Player said (web):[/bold cyan] {event.text}")
                 socketio.emit('player_speech', {'text': event.text})
-                game_db.add_game_event("player_speech_web", f"Player said: {event.text}")
+                record_game_event("player_speech_web", f"Player said: {event.text}")
 
             elif event.type == "voice_stream_event_error":
                 console.print(f"[bold red]Web Voice Pipeline Error: {event.error}[/bold red]")
                 socketio.emit('system', {'message': f"Error: {event.error}", 'isError': True})
-                game_db.add_game_event("pipeline_error_web", f"Error: {event.error}")
+                record_game_event("pipeline_error_web", f"Error: {event.error}")
 
     except Exception as e:
         console.print(f"[bold red]Error in run_voice_pipeline_web: {e}[/bold red]")
         socketio.emit('system', {'message': f"Pipeline Error: {e}", 'isError': True})
     finally:
+        # Flush any batched audio that never reached the steady-state threshold
+        if pending_pcm:
+            ENCODE_POOL.submit(_emit_pcm_chunk, bytes(pending_pcm))
+            pending_pcm.clear()
         if stream.active:
             stream.stop()
         stream.close()
         console.print("[cyan]Web microphone stream stopped.[/cyan]")
         socketio.emit('system', {'message': 'Voice pipeline stopped.'})
         AUDIO_RUNNING = False
+        # Wake the feeder so it observes shutdown instead of waiting for a
+        # frame that will never come, then cancel it outright
+        _ring_wake_consumer()
+        processor_task.cancel()
     # Clean up any remaining temp files after audio processing
-        for f_path in temp_audio_files:
-            try:
-                os.remove(f_path)
-            except OSError:
-                pass
+        _delete_temp_files(temp_audio_files)
+        temp_audio_files.clear()
 
 def start_audio_processing_web():
     """Starts the async voice pipeline task for the web server."""
@@ -1111,7 +1670,13 @@ if __name__ == '__main__':
                 title="RPG Game Master"
             ))
 
-            socketio.run(app, host='0.0.0.0', port=PORT, debug=False)
+            if EVENTLET_AVAILABLE:
+                # Serve through eventlet's WSGI server: green-thread
+                # concurrency instead of Werkzeug's single-threaded dev
+                # server, which serialized every Socket.IO emit
+                eventlet.wsgi.server(eventlet.listen(('0.0.0.0', PORT)), app)
+            else:
+                socketio.run(app, host='0.0.0.0', port=PORT, debug=False)
             break  # If successful, exit the loop
         except OSError as e:
             if "Only one usage of each socket address" in str(e) and attempt < MAX_PORT_ATTEMPTS - 1:
@@ -598,6 +598,15 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    socket.on('response_sentence', (data) => {
+        // Streamed GM narration - append each sentence as it arrives
+        appendGMMessage(data.text);
+    });
+
+    socket.on('response_complete', () => {
+        // Full response already rendered sentence-by-sentence; nothing to add
+    });
+
     socket.on('system', (data) => {
         appendSystemMessage(data.message);
     });
@@ -6,6 +6,7 @@ import io  # Standard library imports first
 import os
 import threading
 import base64
+import functools
 import sounddevice as sd  # Third-party imports
 import numpy as np
 import soundfile as sf
@@ -84,15 +85,12 @@ def save_audio_to_bytes(audio_data, samplerate=44100, file_format='WAV', subtype
     console.print(f"Saving audio data to bytes buffer (Format: {file_format})...")
     try:
         buffer = io.BytesIO()
-        # Ensure data is in the correct format for soundfile if needed
-        # Example: if audio_data is int16, soundfile expects float for WAV PCM_16
-        if audio_data.dtype == np.int16 and subtype == 'PCM_16':
-            # Convert int16 to float32 for soundfile compatibility
-            audio_data_float = audio_data.astype(np.float32) / 32768.0
-        else:
-            audio_data_float = audio_data  # Assume it's already float or compatible
+        # soundfile writes int16 directly for PCM_16; no float round trip.
+        # Only normalize odd float dtypes (e.g. float64) down to float32.
+        if audio_data.dtype.kind == 'f':
+            audio_data = np.asarray(audio_data, dtype=np.float32)
 
-        sf.write(buffer, audio_data_float, samplerate, format=file_format, subtype=subtype)
+        sf.write(buffer, audio_data, samplerate, format=file_format, subtype=subtype)
         buffer.seek(0)  # Rewind buffer to the beginning
         console.print("[green]Audio data saved to bytes buffer.[/green]")
         return buffer.read()
@@ -109,13 +107,11 @@ def save_audio_to_file(audio_data, filename, samplerate=44100, file_format='WAV'
     """Save audio data (numpy array) to a file using soundfile."""
     console.print(f"Saving audio data to {filename}...")
     try:
-        # Ensure data is in the correct format for soundfile if needed
-        if audio_data.dtype == np.int16 and subtype == 'PCM_16':
-            audio_data_float = audio_data.astype(np.float32) / 32768.0
-        else:
-            audio_data_float = audio_data
+        # soundfile writes int16 directly for PCM_16; no float round trip
+        if audio_data.dtype.kind == 'f':
+            audio_data = np.asarray(audio_data, dtype=np.float32)
 
-        sf.write(filename, audio_data_float, samplerate, format=file_format, subtype=subtype)
+        sf.write(filename, audio_data, samplerate, format=file_format, subtype=subtype)
         console.print(f"[bold green]Audio saved to {filename}[/bold green]")
         return True
     except sf.SoundFileError as e:
@@ -128,73 +124,194 @@ def save_audio_to_file(audio_data, filename, samplerate=44100, file_format='WAV'
         console.print(f"[bold red]An unexpected error occurred saving audio to file: {e}[/bold red]")
         return False
 
+# Frames per mixer block; sized for 'high' latency so the mix thread spends
+# nearly all its time blocked inside PortAudio rather than holding the GIL
+MIX_BLOCK_FRAMES = 2048
+
 class SoundManager:
     """Manages sound effects and music for the RPG Game Master."""
-    
+
     def __init__(self, sounds_dir="static/sounds"):
         self.sounds_dir = sounds_dir
-        self.sound_cache = {}  # Cache for loaded sounds
+        self.sound_cache = {}  # sound_name -> (float32 samples, samplerate)
         self.current_music = None
         self.music_volume = 0.7  # 70% volume for background music
         self.sfx_volume = 1.0  # 100% volume for sound effects
-        
+
         # Create sounds directory if it doesn't exist
         os.makedirs(sounds_dir, exist_ok=True)
         os.makedirs(os.path.join(sounds_dir, "ambience"), exist_ok=True)
         os.makedirs(os.path.join(sounds_dir, "effects"), exist_ok=True)
-        
-        # Check if pydub is available
+
+        # Persistent mixer state: one OutputStream fed by one thread replaces
+        # the thread-plus-subprocess spawned per effect by pydub playback
+        self._mix_lock = threading.Lock()
+        self._active_sounds = []  # [mono float32 samples, play position]
+        self._mixer_stream = None
+        self._mixer_thread = None
+        self._mixer_sr = None
+
+        # Decode everything once up front; play/prepare then never touch
+        # ffmpeg or re-decode on the hot path
+        self._preload_sounds()
+        # Web payloads are memoized per (name, volume); volumes are quantized
+        # so the cache stays small
+        self._web_payload_cached = functools.lru_cache(maxsize=64)(self._render_web_payload)
+
+        # Check if pydub is available (only needed as an mp3 decode fallback)
         if not PYDUB_AVAILABLE:
             console.print("[yellow]pydub not available. SoundManager will have limited functionality.[/yellow]")
-    
-    def load_sound(self, sound_name):
-        """Load a sound from file or cache."""
+
+    def _decode_sound(self, sound_path):
+        """Decode an audio file once to (float32 samples, samplerate)."""
+        try:
+            return sf.read(sound_path, dtype='float32')
+        except (sf.SoundFileError, RuntimeError):
+            pass  # soundfile cannot read mp3 everywhere; fall back to pydub
         if not PYDUB_AVAILABLE:
-            console.print("[yellow]pydub not available. Cannot load sounds.[/yellow]")
+            console.print(f"[yellow]Cannot decode '{sound_path}' without pydub.[/yellow]")
             return None
-            
+        try:
+            segment = AudioSegment.from_file(sound_path)
+            samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+            samples /= float(1 << (8 * segment.sample_width - 1))
+            if segment.channels > 1:
+                samples = samples.reshape(-1, segment.channels)
+            return samples, segment.frame_rate
+        except Exception as e:  # pylint: disable=broad-except
+            console.print(f"[bold red]Error decoding sound '{sound_path}': {e}[/bold red]")
+            return None
+
+    def _preload_sounds(self):
+        """Decode all bundled sounds into the cache at startup."""
+        for subdir in ("effects", "ambience"):
+            directory = os.path.join(self.sounds_dir, subdir)
+            try:
+                filenames = os.listdir(directory)
+            except OSError:
+                continue
+            for filename in filenames:
+                name, ext = os.path.splitext(filename)
+                if ext.lower() not in ('.mp3', '.wav', '.ogg') or name in self.sound_cache:
+                    continue
+                decoded = self._decode_sound(os.path.join(directory, filename))
+                if decoded is not None:
+                    self.sound_cache[name] = decoded
+        if self.sound_cache:
+            console.print(f"[green]Preloaded {len(self.sound_cache)} sounds into memory.[/green]")
+
+    def load_sound(self, sound_name):
+        """Return cached (samples, samplerate) for a sound, decoding on miss."""
         if sound_name in self.sound_cache:
             return self.sound_cache[sound_name]
-            
+
         # Look in the sounds directory
         sound_path = os.path.join(self.sounds_dir, "effects", f"{sound_name}.mp3")
         if not os.path.exists(sound_path):
             sound_path = os.path.join(self.sounds_dir, "effects", f"{sound_name}.wav")
-            
+
         if not os.path.exists(sound_path):
             console.print(f"[bold yellow]Warning: Sound '{sound_name}' not found.[/bold yellow]")
             return None
-            
-        # Load and cache the sound
+
+        # Decode and cache the sound
+        decoded = self._decode_sound(sound_path)
+        if decoded is not None:
+            self.sound_cache[sound_name] = decoded
+        return decoded
+
+    def _ensure_mixer(self, samplerate):
+        """Open the persistent output stream and mix thread on first use."""
+        if self._mixer_stream is not None:
+            # One stream, one rate; sounds at other rates take the fallback
+            return self._mixer_sr == samplerate
         try:
-            sound = AudioSegment.from_file(sound_path)
-            self.sound_cache[sound_name] = sound
-            return sound
-        except Exception as e:
-            console.print(f"[bold red]Error loading sound '{sound_name}': {e}[/bold red]")
-            return None
-    
+            stream = sd.OutputStream(
+                samplerate=samplerate, channels=1, dtype='float32',
+                blocksize=MIX_BLOCK_FRAMES, latency='high'
+            )
+            stream.start()
+        except sd.PortAudioError as e:
+            console.print(f"[bold red]PortAudio Error opening mixer stream: {e}[/bold red]")
+            return False
+        self._mixer_stream = stream
+        self._mixer_sr = samplerate
+        self._mixer_thread = threading.Thread(target=self._mixer_loop, daemon=True)
+        self._mixer_thread.start()
+        return True
+
+    def _mixer_loop(self):
+        """Mix active sounds into fixed blocks and write them to PortAudio.
+
+        stream.write blocks in C until the device drains the block, so this
+        thread holds the GIL only for the brief add-and-clip per block.
+        """
+        block = np.zeros(MIX_BLOCK_FRAMES, dtype=np.float32)
+        while True:
+            block[:] = 0.0
+            with self._mix_lock:
+                still_playing = []
+                for entry in self._active_sounds:
+                    samples, position = entry
+                    chunk = samples[position:position + MIX_BLOCK_FRAMES]
+                    block[:len(chunk)] += chunk
+                    entry[1] = position + len(chunk)
+                    if entry[1] < len(samples):
+                        still_playing.append(entry)
+                self._active_sounds = still_playing
+            np.clip(block, -1.0, 1.0, out=block)
+            try:
+                self._mixer_stream.write(block)
+            except sd.PortAudioError as e:
+                console.print(f"[bold red]PortAudio Error in mixer thread: {e}[/bold red]")
+                # Tear the mixer down so _ensure_mixer reopens it (or takes
+                # the sd.play fallback) on the next play instead of queueing
+                # sounds onto a stream nothing drains anymore
+                with self._mix_lock:
+                    stream = self._mixer_stream
+                    self._mixer_stream = None
+                    self._mixer_thread = None
+                    self._mixer_sr = None
+                    self._active_sounds = []
+                try:
+                    stream.close()
+                except sd.PortAudioError:
+                    pass
+                break
+
     def play_sound(self, sound_name):
         """Play a sound effect asynchronously."""
-        if not PYDUB_AVAILABLE:
-            console.print("[yellow]pydub not available. Cannot play sounds.[/yellow]")
+        decoded = self.load_sound(sound_name)
+        if decoded is None:
             return False
-            
-        sound = self.load_sound(sound_name)
-        if sound is None:
+
+        # Volume is a cheap vectorized scale on the cached samples; no
+        # AudioSegment clone, no per-play ffmpeg or subprocess
+        samples, samplerate = decoded
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        scaled = samples * self.sfx_volume
+
+        # Queue onto the persistent mixer stream: playback starts on the
+        # next block, with no thread or stream setup on the play path
+        if self._ensure_mixer(samplerate):
+            with self._mix_lock:
+                # Re-check under the lock: the mix thread may have torn the
+                # stream down on a device error since _ensure_mixer looked
+                if self._mixer_stream is not None:
+                    self._active_sounds.append([scaled, 0])
+                    return True
+
+        # Mixer unavailable or running at a different rate; one-shot fallback
+        try:
+            sd.play(scaled, samplerate, blocking=False)
+        except sd.PortAudioError as e:
+            console.print(f"[bold red]PortAudio Error playing '{sound_name}': {e}[/bold red]")
             return False
-            
-        # Adjust volume and play in a separate thread
-        sound = sound.apply_gain(self.sfx_volume)
-        threading.Thread(target=pydub_play, args=(sound,), daemon=True).start()
         return True
     
     def play_themed_sound(self, theme, intensity="medium"):
         """Play a sound based on a theme and intensity."""
-        if not PYDUB_AVAILABLE:
-            console.print("[yellow]pydub not available. Cannot play themed sounds.[/yellow]")
-            return False
-            
         # Map themes to appropriate sound effects
         theme_mapping = {
             "combat": {
@@ -234,22 +351,20 @@ class SoundManager:
         
     def prepare_sound_for_web(self, sound_name):
         """Prepare a sound for web playback (returns base64 encoded WAV)."""
-        if not PYDUB_AVAILABLE:
-            console.print("[yellow]pydub not available. Cannot prepare sounds for web.[/yellow]")
-            return None
-            
-        sound = self.load_sound(sound_name)
-        if sound is None:
+        return self._web_payload_cached(sound_name, round(self.sfx_volume, 3))
+
+    def _render_web_payload(self, sound_name, volume):
+        """Render a sound to a base64 WAV payload; memoized per (name, volume)."""
+        decoded = self.load_sound(sound_name)
+        if decoded is None:
             return None
-            
-        # Apply volume adjustment
-        sound = sound.apply_gain(self.sfx_volume)
-        
-        # Export to WAV format in memory
+
+        # Apply volume adjustment and encode to WAV in memory
+        samples, samplerate = decoded
         buffer = io.BytesIO()
-        sound.export(buffer, format="wav")
+        sf.write(buffer, samples * volume, samplerate, format='WAV', subtype='PCM_16')
         buffer.seek(0)
-        
+
         # Base64 encode for web transport
         b64_encoded = base64.b64encode(buffer.read()).decode('utf-8')
         return {
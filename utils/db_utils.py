@@ -2,13 +2,101 @@
 Database utility functions for the RPG Game Master.
 Uses ChromaDB for storing game state, characters, and history.
 """
+import os
 import json
-import chromadb
+import base64
+import concurrent.futures
 from rich.console import Console
 
 # Create console instance for pretty printing
 console = Console()
 
+# Try to use orjson (C extension) for the JSON blobs stored in ChromaDB,
+# falling back to the stdlib when it is not installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Optional zstd compression for the stored game state: world-state JSON
+# shrinks several-fold, cutting backing-store I/O on every save and load
+try:
+    import zstandard as zstd
+    _ZSTD_COMPRESSOR = zstd.ZstdCompressor(level=3)
+    _ZSTD_DECOMPRESSOR = zstd.ZstdDecompressor()
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstd = None
+    ZSTD_AVAILABLE = False
+
+def _json_dumps(obj):
+    """Serialize obj to a str (Chroma documents/metadata are strings)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+def _json_loads(data):
+    """Parse a JSON str/bytes with the fastest available decoder."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Character dicts are flattened into namespaced metadata keys so Chroma
+# stores the scalars natively instead of one opaque JSON blob per row.
+# The 'f.'/'j.' namespaces keep user fields from ever colliding with the
+# bookkeeping keys ('type', 'fmt'), and rows carry fmt=flat so readers
+# never have to sniff user-controlled keys to pick a decode path.
+_FLAT_SEP = "."
+_FLAT_FMT = "flat"
+_FLAT_PREFIX = "f."  # Leaf stored as a native Chroma scalar
+_JSON_PREFIX = "j."  # Leaf Chroma cannot hold natively, JSON-encoded
+
+def _escape_key_part(part):
+    """Escape a key segment so literal separators survive the round-trip."""
+    return part.replace("%", "%25").replace(_FLAT_SEP, "%2E")
+
+def _unescape_key_part(part):
+    return part.replace("%2E", _FLAT_SEP).replace("%25", "%")
+
+def _flatten_dict(data, prefix=""):
+    """Flatten a nested dict to namespaced dotted keys for Chroma metadata.
+
+    Nested dicts become dotted paths under the 'f.' namespace; values
+    Chroma cannot store natively (lists, None, ...) ride JSON-encoded
+    under 'j.'. Dots inside original keys are percent-escaped so they
+    un-flatten into the same nesting they came from.
+    """
+    flat = {}
+    for key, value in data.items():
+        full_key = f"{prefix}{_escape_key_part(str(key))}"
+        if isinstance(value, dict) and value:
+            flat.update(_flatten_dict(value, f"{full_key}{_FLAT_SEP}"))
+        elif isinstance(value, (str, int, float, bool)):
+            flat[f"{_FLAT_PREFIX}{full_key}"] = value
+        else:
+            flat[f"{_JSON_PREFIX}{full_key}"] = _json_dumps(value)
+    return flat
+
+def _unflatten_dict(meta):
+    """Rebuild the original nested dict from flattened metadata keys."""
+    data = {}
+    for key, value in meta.items():
+        if key.startswith(_FLAT_PREFIX):
+            path = key[len(_FLAT_PREFIX):]
+        elif key.startswith(_JSON_PREFIX):
+            path = key[len(_JSON_PREFIX):]
+            value = _json_loads(value)
+        else:
+            continue  # Bookkeeping keys live outside the namespaces
+        parts = [_unescape_key_part(p) for p in path.split(_FLAT_SEP)]
+        node = data
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return data
+
 # pylint: disable=no-member
 class GameDatabase:
     """
@@ -19,6 +107,11 @@ class GameDatabase:
         """
         Initialize the ChromaDB client with persistence
         """
+        # Imported here rather than at module scope: chromadb drags in
+        # onnxruntime and friends, hundreds of ms that short-lived callers
+        # of the other utils should not pay
+        import chromadb  # pylint: disable=import-outside-toplevel
+
         # Pre-declare instance attributes for pylint
         self.client = None
         self.game_state_collection = None
@@ -36,6 +129,24 @@ class GameDatabase:
         self._initialize_collection(f"{collection_name}_characters", "characters_collection")
         self._initialize_collection(f"{collection_name}_history", "game_history_collection")
 
+        # Event ids are minted from this counter; seeded with a single count()
+        # here so event writes never pay a per-event aggregation round-trip
+        self._event_seq = self.game_history_collection.count()
+
+        # Decoded character blobs keyed by id; repeated listings and searches
+        # reuse the parse instead of re-tokenizing the same JSON every call
+        self._character_cache = {}
+
+        # Last decoded game state tagged with a write-version counter:
+        # repeat loads between writes skip the DB round-trip and the
+        # decompress/parse entirely
+        self._state_version = 0
+        self._state_cache = None  # (version, state dict)
+
+        # Per-write success prints render ANSI and flush stdout, which adds
+        # up in busy sessions; opt back in with GAMEWEAVER_VERBOSE=1
+        self._verbose = bool(os.getenv("GAMEWEAVER_VERBOSE"))
+
     def _initialize_collection(self, name, attribute_name):
         """Helper to initialize a collection"""
         try:
@@ -46,21 +157,59 @@ class GameDatabase:
             console.print(f"[bold red]Error initializing collection '{name}': {e}[/bold red]")
             raise
 
+    def _decode_character(self, character_id, meta):
+        """Rebuild a character dict from its row metadata, reusing the
+        result across calls.
+
+        Keyed by (id, hash of the metadata items), so a re-upserted
+        character misses naturally. Returns a shallow copy because callers
+        attach id/description fields to the result. Rows without the
+        fmt=flat tag predate the flattened layout and decode through the
+        legacy JSON-blob path.
+        """
+        # Flattened metadata values are all hashable scalars
+        key_hash = hash(tuple(sorted(meta.items())))
+        cached = self._character_cache.get(character_id)
+        if cached is not None and cached[0] == key_hash:
+            return dict(cached[1])
+        if meta.get('fmt') == _FLAT_FMT:
+            data = _unflatten_dict(meta)
+        else:
+            data = _json_loads(meta['data'])
+        self._character_cache[character_id] = (key_hash, data)
+        return dict(data)
+
     def store_game_state(self, state_data):
         """
         Store the current game state in ChromaDB
         """
         try:
-            state_json = json.dumps(state_data)
+            state_json = _json_dumps(state_data)
+            if ZSTD_AVAILABLE:
+                # Chroma documents are strings, so the compressed bytes ride
+                # base64-encoded; the enc tag tells the loader how to unwrap
+                document = base64.b64encode(
+                    _ZSTD_COMPRESSOR.compress(state_json.encode('utf-8'))
+                ).decode('ascii')
+                state_metadata = {"type": "game_state", "enc": "zstd+b64"}
+            else:
+                document = state_json
+                state_metadata = {"type": "game_state"}
             # Use upsert for simplicity (creates if not exists, updates if exists)
             self.game_state_collection.upsert(
                 ids=["game_state"],
-                documents=[state_json],  # Note: documents must be a list
-                metadatas=[{"type": "game_state"}]  # Note: metadatas must be a list
+                documents=[document],  # Note: documents must be a list
+                metadatas=[state_metadata]  # Note: metadatas must be a list
             )
-            console.print("[bold green]Game state stored/updated in database[/bold green]")
+            # Write-through: the next load can serve this state without a
+            # round-trip. Shallow-copied so the caller's later mutations
+            # don't leak into the cache
+            self._state_version += 1
+            self._state_cache = (self._state_version, dict(state_data))
+            if self._verbose:
+                console.print("[bold green]Game state stored/updated in database[/bold green]")
             return True
-        except json.JSONDecodeError as e:
+        except (TypeError, ValueError) as e:
             console.print(f"[bold red]Error encoding game state to JSON: {e}[/bold red]")
             return False
         except Exception as e:  # pylint: disable=broad-except
@@ -72,12 +221,29 @@ class GameDatabase:
         Load the current game state from ChromaDB
         """
         try:
-            result = self.game_state_collection.get(ids=["game_state"], limit=1)
+            if self._state_cache is not None and self._state_cache[0] == self._state_version:
+                return dict(self._state_cache[1])
+            result = self.game_state_collection.get(
+                ids=["game_state"], limit=1, include=["documents", "metadatas"]
+            )
             if result and result.get('documents'):
-                return json.loads(result['documents'][0])
+                document = result['documents'][0]
+                state_metadata = (result.get('metadatas') or [{}])[0] or {}
+                # States saved before compression existed have no enc tag
+                # and parse as plain JSON
+                if state_metadata.get("enc") == "zstd+b64":
+                    if not ZSTD_AVAILABLE:
+                        console.print("[bold red]Stored game state is zstd-compressed but zstandard is not installed.[/bold red]")
+                        return None
+                    document = _ZSTD_DECOMPRESSOR.decompress(base64.b64decode(document))
+                state = _json_loads(document)
+                if isinstance(state, dict):
+                    self._state_cache = (self._state_version, state)
+                    return dict(state)
+                return state
             console.print("[yellow]No existing game state found in database.[/yellow]")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             console.print(f"[bold red]Error decoding game state from JSON: {e}[/bold red]")
             return None
         except Exception as e:  # pylint: disable=broad-except
@@ -89,17 +255,20 @@ class GameDatabase:
         Create a character entity in ChromaDB
         """
         try:
-            character_json = json.dumps(character_data)
+            # Flattened layout: Chroma stores the scalars natively, so reads
+            # rebuild the dict with plain dict ops instead of a JSON parse
+            flat = _flatten_dict(character_data)
             # Use upsert to handle potential re-creation
             self.characters_collection.upsert(
                 ids=[character_id],
                 documents=[character_description],
-                metadatas=[{"data": character_json, "type": "character"}]
+                metadatas=[{**flat, "type": "character", "fmt": _FLAT_FMT}]
             )
+            self._character_cache.pop(character_id, None)  # Blob changed
             console.print(f"[bold green]Character '{character_id}' created/updated in database[/bold green]")
             return True
-        except json.JSONDecodeError as e:
-            console.print(f"[bold red]Error encoding character data to JSON for {character_id}: {e}[/bold red]")
+        except (TypeError, ValueError) as e:
+            console.print(f"[bold red]Error encoding character data for {character_id}: {e}[/bold red]")
             return False
         except Exception as e:  # pylint: disable=broad-except
             console.print(f"[bold red]Error creating character entity '{character_id}' in ChromaDB: {e}[/bold red]")
@@ -113,12 +282,12 @@ class GameDatabase:
             result = self.characters_collection.get(ids=[character_id], limit=1)
             if result and result.get('metadatas'):
                 # Combine the document (description) with the data
-                character_data = json.loads(result['metadatas'][0]['data'])
+                character_data = self._decode_character(character_id, result['metadatas'][0])
                 character_data["description"] = result['documents'][0]
                 return character_data
             console.print(f"[yellow]Character '{character_id}' not found in database.[/yellow]")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             console.print(f"[bold red]Error decoding character data for {character_id}: {e}[/bold red]")
             return None
         except Exception as e:  # pylint: disable=broad-except
@@ -130,77 +299,150 @@ class GameDatabase:
         List all characters in the database
         """
         try:
-            result = self.characters_collection.get(where={"type": "character"}, limit=100)
+            # Project only what is read below; embedding vectors are the bulk
+            # of a row and never used here
+            result = self.characters_collection.get(
+                where={"type": "character"}, limit=100,
+                include=["documents", "metadatas"]
+            )
             characters = []
             if result and result.get('ids'):
-                for i, character_id in enumerate(result['ids']):
-                    try:
-                        character_data = json.loads(result['metadatas'][i]['data'])
-                        character_data["id"] = character_id
-                        character_data["description"] = result['documents'][i]
-                        characters.append(character_data)
-                    except json.JSONDecodeError as e:
-                        console.print(f"[bold red]Error decoding data for character {character_id}: {e}[/bold red]")
-                    except IndexError:
-                        console.print(
-                            f"[bold red]Mismatch in data for character {character_id}. Skipping.[/bold red]"
-                        )
+                # Bind row arrays and hot callables once, outside the loop.
+                # Truncating to the shortest array up front replaces the old
+                # per-row IndexError handler; rows are our own writes, so the
+                # fast loop runs with no exception frames and falls back to
+                # the per-row slow path only if a stored blob is actually bad
+                ids = result['ids']
+                docs = result['documents']
+                metas = result['metadatas']
+                n = min(len(ids), len(docs), len(metas))
+                decode = self._decode_character
+                append = characters.append
+                try:
+                    for i in range(n):
+                        character_data = decode(ids[i], metas[i])
+                        character_data["id"] = ids[i]
+                        character_data["description"] = docs[i]
+                        append(character_data)
+                except (ValueError, KeyError):
+                    return self._list_characters_slow(ids, docs, metas, n)
             return characters
         except Exception as e:  # pylint: disable=broad-except
             console.print(f"[bold red]Error listing characters from ChromaDB: {e}[/bold red]")
             return []
 
+    def _list_characters_slow(self, ids, docs, metas, n):
+        """Per-row fallback for list_characters when a stored row is bad.
+
+        Only reached when the fast loop hit a decode failure, so the cost
+        of per-row exception handling is paid on corrupt data alone.
+        """
+        characters = []
+        for i in range(n):
+            try:
+                character_data = self._decode_character(ids[i], metas[i])
+                character_data["id"] = ids[i]
+                character_data["description"] = docs[i]
+                characters.append(character_data)
+            except ValueError as e:
+                console.print(f"[bold red]Error decoding data for character {ids[i]}: {e}[/bold red]")
+            except KeyError:
+                console.print(f"[bold red]Mismatch in data for character {ids[i]}. Skipping.[/bold red]")
+        return characters
+
     def add_game_event(self, event_type, event_description, metadata=None):
         """
         Add a game event to the history collection
         """
         try:
-            # Generate a unique ID for the event based on current count
-            current_count = self.game_history_collection.count()
-            event_id = f"event_{current_count + 1}"
+            # Generate a unique ID from the in-memory counter; no count() call
+            self._event_seq += 1
+            # Zero-padded so lexicographic id order equals insertion order
+            event_id = f"event_{self._event_seq:010d}"
             # Create metadata
             event_metadata = {"type": event_type}
             if metadata:
                 event_metadata.update(metadata)
+            event_metadata["seq"] = self._event_seq
             # Add event to collection
             self.game_history_collection.add(
                 ids=[event_id],
                 documents=[event_description],
                 metadatas=[event_metadata]
             )
-            console.print(f"[bold green]Event '{event_id}' added to game history: {event_type}[/bold green]")
+            if self._verbose:
+                console.print(f"[bold green]Event '{event_id}' added to game history: {event_type}[/bold green]")
             return event_id
         except Exception as e:  # pylint: disable=broad-except
+            self._event_seq -= 1  # Id was never written; reuse it next time
             console.print(f"[bold red]Error adding game event to ChromaDB: {e}[/bold red]")
             return None
 
+    def add_game_events(self, events):
+        """
+        Add several game events in one write.
+
+        Args:
+            events: Iterable of (event_type, event_description, metadata)
+                tuples; metadata may be None.
+
+        Returns:
+            list: The ids assigned to the stored events (empty on failure)
+        """
+        ids = []
+        documents = []
+        metadatas = []
+        for event_type, event_description, metadata in events:
+            self._event_seq += 1
+            ids.append(f"event_{self._event_seq:010d}")
+            documents.append(event_description)
+            event_metadata = {"type": event_type}
+            if metadata:
+                event_metadata.update(metadata)
+            event_metadata["seq"] = self._event_seq
+            metadatas.append(event_metadata)
+        if not ids:
+            return []
+        try:
+            # One round-trip regardless of batch size
+            self.game_history_collection.add(ids=ids, documents=documents, metadatas=metadatas)
+            if self._verbose:
+                console.print(f"[bold green]{len(ids)} events added to game history[/bold green]")
+            return ids
+        except Exception as e:  # pylint: disable=broad-except
+            self._event_seq -= len(ids)
+            console.print(f"[bold red]Error adding game events to ChromaDB: {e}[/bold red]")
+            return []
+
     def get_game_history(self, limit=20, event_type=None):
         """
         Get recent game history events
         """
         try:
-            query_params = {"limit": limit}
+            query_params = {"limit": limit, "include": ["documents", "metadatas"]}
             if event_type:
                 query_params["where"] = {"type": event_type}
             result = self.game_history_collection.get(**query_params)
             events = []
             if result and result.get('ids'):
-                for i, event_id in enumerate(result['ids']):
-                    try:
-                        events.append({
-                            "id": event_id,
-                            "type": result['metadatas'][i]['type'],
-                            "description": result['documents'][i],
-                            "metadata": result['metadatas'][i]
-                        })
-                    except IndexError:
-                        console.print(f"[bold red]Mismatch in data for event {event_id}. Skipping.[/bold red]")
-            # Sort events by ID (assuming chronological order based on ID generation)
-            try:
-                events.sort(key=lambda x: int(x['id'].split('_')[1]))
-            except (ValueError, IndexError):
-                console.print("[yellow]Could not sort history events by ID.[/yellow]")
-                # Handle cases where ID format might be unexpected
+                # Truncating to the shortest array covers the old per-row
+                # IndexError handler, so the loop runs exception-frame free
+                ids = result['ids']
+                docs = result['documents']
+                metas = result['metadatas']
+                n = min(len(ids), len(docs), len(metas))
+                append = events.append
+                for i in range(n):
+                    append({
+                        "id": ids[i],
+                        "type": metas[i].get('type'),
+                        "description": docs[i],
+                        "metadata": metas[i]
+                    })
+            # Events carry their numeric sequence in metadata: a plain
+            # integer sort, no id splitting or parse exceptions. Rows from
+            # before seq existed sort first, which keeps them oldest.
+            events.sort(key=lambda x: x['metadata'].get('seq', 0))
             return events
         except Exception as e:  # pylint: disable=broad-except
             console.print(f"[bold red]Error getting game history from ChromaDB: {e}[/bold red]")
@@ -211,40 +453,74 @@ class GameDatabase:
         Search game content across characters and history using vector search
         """
         results = {"characters": [], "history": []}
+        # The two collection queries are independent round-trips, so fire
+        # them together and overlap their latency
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            character_future = executor.submit(
+                self.characters_collection.query,
+                query_texts=[query], n_results=limit,
+                include=["documents", "metadatas", "distances"]
+            )
+            history_future = executor.submit(
+                self.game_history_collection.query,
+                query_texts=[query], n_results=limit,
+                include=["documents", "metadatas", "distances"]
+            )
         try:
             # Search characters
-            character_results = self.characters_collection.query(query_texts=[query], n_results=limit)
+            character_results = character_future.result()
             if character_results and character_results.get('ids') and character_results['ids'][0]:
-                for i, character_id in enumerate(character_results['ids'][0]):
-                    try:
-                        results["characters"].append({
-                            "id": character_id,
-                            "description": character_results['documents'][0][i],
-                            "data": json.loads(character_results['metadatas'][0][i]['data']),
-                            "distance": character_results['distances'][0][i]
-                                if character_results.get('distances') else None
+                ids = character_results['ids'][0]
+                docs = character_results['documents'][0]
+                metas = character_results['metadatas'][0]
+                distances = character_results['distances'][0] if character_results.get('distances') else None
+                # One length check up front instead of a per-row IndexError
+                # handler inside the loop
+                n = min(len(ids), len(docs), len(metas))
+                decode = self._decode_character
+                append = results["characters"].append
+                try:
+                    for i in range(n):
+                        append({
+                            "id": ids[i],
+                            "description": docs[i],
+                            "data": decode(ids[i], metas[i]),
+                            "distance": distances[i] if distances else None
                         })
-                    except (json.JSONDecodeError, IndexError, KeyError) as e:
-                        console.print(
-                            f"[bold red]Error processing character result {character_id}: {e}[/bold red]"
-                        )
+                except (ValueError, KeyError):
+                    # Rare bad row: redo with per-row handling off the hot path
+                    del results["characters"][:]
+                    for i in range(n):
+                        try:
+                            append({
+                                "id": ids[i],
+                                "description": docs[i],
+                                "data": decode(ids[i], metas[i]),
+                                "distance": distances[i] if distances else None
+                            })
+                        except (ValueError, KeyError) as e:
+                            console.print(
+                                f"[bold red]Error processing character result {ids[i]}: {e}[/bold red]"
+                            )
         except Exception as e:  # pylint: disable=broad-except
             console.print(f"[bold red]Error searching characters in ChromaDB: {e}[/bold red]")
         try:
             # Search history
-            history_results = self.game_history_collection.query(query_texts=[query], n_results=limit)
+            history_results = history_future.result()
             if history_results and history_results.get('ids') and history_results['ids'][0]:
-                for i, event_id in enumerate(history_results['ids'][0]):
-                    try:
-                        results["history"].append({
-                            "id": event_id,
-                            "description": history_results['documents'][0][i],
-                            "type": history_results['metadatas'][0][i]['type'],
-                            "distance": history_results['distances'][0][i]
-                                if history_results.get('distances') else None
-                        })
-                    except (IndexError, KeyError) as e:
-                        console.print(f"[bold red]Error processing history result {event_id}: {e}[/bold red]")
+                ids = history_results['ids'][0]
+                docs = history_results['documents'][0]
+                metas = history_results['metadatas'][0]
+                distances = history_results['distances'][0] if history_results.get('distances') else None
+                n = min(len(ids), len(docs), len(metas))
+                append = results["history"].append
+                for i in range(n):
+                    append({
+                        "id": ids[i],
+                        "description": docs[i],
+                        "type": metas[i].get('type'),
+                        "distance": distances[i] if distances else None
+                    })
         except Exception as e:  # pylint: disable=broad-except
             console.print(f"[bold red]Error searching history in ChromaDB: {e}[/bold red]")
         return results
@@ -4,12 +4,23 @@ Handles loading, saving, and managing game files.
 """
 import os
 import json
-import PyPDF2
+import mmap
+import functools
+import concurrent.futures
 from rich.console import Console
 
 # Create console instance for pretty printing
 console = Console()
 
+# Try to use orjson (C extension) for game-state backups, falling back to
+# the stdlib when it is not installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 def load_game_file(file_path):
     """
     Load and parse game files (text or PDF) for game content.
@@ -21,10 +32,9 @@ def load_game_file(file_path):
         str: Content of the file or None if loading failed
     """
     try:
-        if file_path.endswith('.pdf'):
-            return read_pdf_file(file_path)
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        # Keyed by (path, mtime): repeat loads of an unchanged file return
+        # the prior parse instantly, and an edited file misses naturally
+        return _read_game_file_cached(file_path, os.path.getmtime(file_path))
     except FileNotFoundError:
         console.print(f"[bold red]Error: Game file not found at {file_path}[/bold red]")
         return None
@@ -35,6 +45,20 @@ def load_game_file(file_path):
         console.print(f"[bold red]Error loading game file {file_path}: {e}[/bold red]")
         return None
 
+@functools.lru_cache(maxsize=64)
+def _read_game_file_cached(file_path, _mtime):
+    """Read and parse a game file; results are memoized per (path, mtime)."""
+    if file_path.endswith('.pdf'):
+        return read_pdf_file(file_path)
+    # Large rulebooks: map the file and decode straight from the pages
+    # instead of double-buffering through an interim bytes read
+    if os.path.getsize(file_path) > 1024 * 1024:
+        with open(file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:].decode('utf-8')
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
 def read_pdf_file(file_path):
     """
     Extract text from PDF files.
@@ -45,20 +69,35 @@ def read_pdf_file(file_path):
     Returns:
         str: Extracted text from the PDF file or None if extraction failed
     """
-    text = ""
+    # Imported on first use: PDF support costs import time that callers who
+    # never touch a PDF should not pay at startup
+    import PyPDF2  # pylint: disable=import-outside-toplevel
     try:
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                if page_text:  # Check if text extraction was successful
-                    text += page_text
-                else:
-                    console.print(
-                        f"[yellow]Warning: Could not extract text from page {page_num + 1} "
-                        f"of {file_path}[/yellow]"
-                    )
-        return text
+            num_pages = len(PyPDF2.PdfReader(file).pages)
+
+        def _extract_page(page_num):
+            # PdfReader is not thread-safe: pages resolve objects lazily via
+            # seeks on the shared stream, so each extraction opens its own
+            # handle and reader rather than sharing one across workers
+            with open(file_path, 'rb') as page_file:
+                page = PyPDF2.PdfReader(page_file).pages[page_num]
+                return page.extract_text() or ''
+
+        # Pages extract independently and decode time dominates, so fan
+        # the extraction out across a small thread pool; map preserves
+        # page order for the final join
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1)
+        ) as executor:
+            parts = list(executor.map(_extract_page, range(num_pages)))
+        for page_num, page_text in enumerate(parts):
+            if not page_text:  # Check if text extraction was successful
+                console.print(
+                    f"[yellow]Warning: Could not extract text from page {page_num + 1} "
+                    f"of {file_path}[/yellow]"
+                )
+        return ''.join(parts)
     except PyPDF2.errors.PdfReadError as e:
         console.print(
             f"[bold red]Error reading PDF file {file_path}: {e}. "
@@ -90,9 +129,13 @@ def list_available_games():
             )
             os.makedirs(directory, exist_ok=True)
             return []  # No files if directory didn't exist
-        for filename in os.listdir(directory):
-            if filename.endswith(('.txt', '.pdf')):
-                game_files.append(os.path.join(directory, filename))
+        # scandir hands back DirEntry objects with the joined path already
+        # built and the file type cached from the directory read
+        with os.scandir(directory) as entries:
+            game_files = [
+                entry.path for entry in entries
+                if entry.is_file() and entry.name.endswith(('.txt', '.pdf'))
+            ]
         return game_files
     except PermissionError:
         console.print(f"[bold red]Error: Permission denied accessing directory {directory}[/bold red]")
@@ -113,8 +156,13 @@ def save_game_state(state, filename="game_state.json"):
         bool: True if save successful, False otherwise
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(state, file, indent=4)
+        if ORJSON_AVAILABLE:
+            # orjson produces bytes directly; write them without an encode step
+            with open(filename, 'wb') as file:
+                file.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as file:
+                json.dump(state, file, indent=4)
         console.print(f"[bold green]Game state backup saved to {filename}[/bold green]")
         return True
     except TypeError as e:
@@ -141,9 +189,10 @@ def load_game_state(filename="game_state.json"):
         console.print(f"[yellow]Game state backup file {filename} does not exist.[/yellow]")
         return None
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except json.JSONDecodeError as e:
+        state = _read_game_state_cached(filename, os.path.getmtime(filename))
+        # Shallow copy so callers mutating the state don't poison the cache
+        return dict(state) if isinstance(state, dict) else state
+    except ValueError as e:  # Covers both json and orjson decode errors
         console.print(f"[bold red]Error decoding JSON from game state file {filename}: {e}[/bold red]")
         return None
     except FileNotFoundError:
@@ -156,3 +205,12 @@ def load_game_state(filename="game_state.json"):
     except Exception as e:  # pylint: disable=broad-except
         console.print(f"[bold red]Error loading game state backup from {filename}: {e}[/bold red]")
         return None
+
+@functools.lru_cache(maxsize=8)
+def _read_game_state_cached(filename, _mtime):
+    """Read and decode a state backup; memoized per (path, mtime)."""
+    if ORJSON_AVAILABLE:
+        with open(filename, 'rb') as file:
+            return orjson.loads(file.read())
+    with open(filename, 'r', encoding='utf-8') as file:
+        return json.load(file)
@@ -3,23 +3,51 @@ Gemini Pro 2 integration utilities for enhanced AI capabilities.
 """
 import os
 import asyncio
+import concurrent.futures
+import functools
 from rich.console import Console
 
 # Create console instance for pretty printing
 console = Console()
 
-# Try to import Google AI modules
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-    console.print("[green]Google GenerativeAI imported successfully.[/green]")
-except ImportError:
-    GEMINI_AVAILABLE = False
-    console.print("[yellow]Google GenerativeAI not available. Gemini features will be disabled.[/yellow]")
+# Dedicated pool for blocking Gemini calls so high-fanout scenes (parallel
+# sound + dice analysis) never contend with asyncio's shared default
+# executor. Only used on SDKs without the native async API.
+_GEMINI_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=16, thread_name_prefix="gemini"
+)
+
+@functools.cache
+def _gemini_module():
+    """Import google.generativeai on first use; returns None if unavailable.
+
+    The SDK import costs hundreds of ms, so it is deferred until a Gemini
+    feature is actually touched instead of running at module load.
+    """
+    try:
+        import google.generativeai as genai  # pylint: disable=import-outside-toplevel
+        console.print("[green]Google GenerativeAI imported successfully.[/green]")
+        return genai
+    except ImportError:
+        console.print("[yellow]Google GenerativeAI not available. Gemini features will be disabled.[/yellow]")
+        return None
+
+# GenerativeModel instances keyed by model name: construction re-parses
+# client config, and the generation_config is passed per call anyway, so one
+# instance per name is safe to share
+_MODEL_CACHE = {}
+
+def _get_model(model_name):
+    """Return a cached GenerativeModel, constructing it on first use."""
+    model = _MODEL_CACHE.get(model_name)
+    if model is None:
+        model = _MODEL_CACHE.setdefault(model_name, _gemini_module().GenerativeModel(model_name))
+    return model
 
 def initialize_gemini():
     """Initialize the Gemini API with API key from environment."""
-    if not GEMINI_AVAILABLE:
+    genai = _gemini_module()
+    if genai is None:
         console.print("[yellow]Gemini API not available. Skipping initialization.[/yellow]")
         return False
     try:
@@ -38,17 +66,31 @@ def initialize_gemini():
 
 async def generate_gemini_content(prompt, model="gemini-pro-2", temperature=0.7):
     """Generate content using Gemini models."""
-    if not GEMINI_AVAILABLE:
+    if _gemini_module() is None:
         return "Gemini API not available."
     try:
-        # Initialize the model
-        model = genai.GenerativeModel(model)
-        # Generate content
-        response = await asyncio.to_thread(
-            model.generate_content,
-            prompt,
-            generation_config={"temperature": temperature}
-        )
+        # Reuse the model instance across calls
+        model = _get_model(model)
+        # Generate content through the SDK's native coroutine: no thread
+        # hop, and concurrent requests share the loop instead of each
+        # pinning an executor thread for the whole HTTP call
+        if hasattr(model, 'generate_content_async'):
+            response = await model.generate_content_async(
+                prompt,
+                generation_config={"temperature": temperature}
+            )
+        else:
+            # Older SDKs only expose the blocking call; run it on the
+            # dedicated pool so it cannot starve the default executor
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                _GEMINI_POOL,
+                functools.partial(
+                    model.generate_content,
+                    prompt,
+                    generation_config={"temperature": temperature}
+                )
+            )
         # Return response
         if hasattr(response, 'text'):
             return response.text
@@ -58,11 +100,22 @@ async def generate_gemini_content(prompt, model="gemini-pro-2", temperature=0.7)
         console.print(f"[bold red]Error generating content with Gemini: {e}[/bold red]")
         return f"Error generating content: {str(e)}"
 
-async def get_sound_recommendations(scene_description):
-    """Use Gemini to recommend appropriate sound effects for a scene."""
-    if not GEMINI_AVAILABLE:
-        return "Gemini API not available."
-    prompt = f"""
+async def generate_gemini_content_batch(prompts, model="gemini-pro-2", temperature=0.7):
+    """Generate content for several prompts concurrently.
+
+    Returns the responses in prompt order; individual failures come back
+    as error strings, matching generate_gemini_content.
+    """
+    if _gemini_module() is None:
+        return ["Gemini API not available."] * len(prompts)
+    return await asyncio.gather(*(
+        generate_gemini_content(prompt, model=model, temperature=temperature)
+        for prompt in prompts
+    ))
+
+# Prompt templates built once at import; call sites only substitute the
+# variable pieces instead of re-formatting the whole block each time
+_SOUND_PROMPT_TMPL = """
     You are a sound designer for a dark fantasy RPG.
     Based on the following scene description, recommend appropriate sound effects.
 
@@ -74,18 +127,12 @@ async def get_sound_recommendations(scene_description):
     For each category, provide 2-3 specific suggestions that match the scene's atmosphere.
 
     Scene description:
-    {scene_description}
+    {scene}
     """
-    response = await generate_gemini_content(prompt, temperature=0.2)
-    return response
 
-async def analyze_dice_strategy(dice_notation, context=""):
-    """Use Gemini to analyze dice probabilities and suggest strategies."""
-    if not GEMINI_AVAILABLE:
-        return "Gemini API not available."
-    prompt = f"""
+_DICE_PROMPT_TMPL = """
     You are a statistical analyst for tabletop RPGs.
-    Analyze the following dice roll: {dice_notation}
+    Analyze the following dice roll: {notation}
 
     Additional context: {context}
 
@@ -97,9 +144,23 @@ async def analyze_dice_strategy(dice_notation, context=""):
 
     Present this information in a concise, easy-to-understand format.
     """
+
+async def get_sound_recommendations(scene_description):
+    """Use Gemini to recommend appropriate sound effects for a scene."""
+    if _gemini_module() is None:
+        return "Gemini API not available."
+    prompt = _SOUND_PROMPT_TMPL.format(scene=scene_description)
+    response = await generate_gemini_content(prompt, temperature=0.2)
+    return response
+
+async def analyze_dice_strategy(dice_notation, context=""):
+    """Use Gemini to analyze dice probabilities and suggest strategies."""
+    if _gemini_module() is None:
+        return "Gemini API not available."
+    prompt = _DICE_PROMPT_TMPL.format(notation=dice_notation, context=context)
     response = await generate_gemini_content(prompt, temperature=0.1)
     return response
 
 def is_gemini_available():
     """Check if Gemini API is available and initialized."""
-    return GEMINI_AVAILABLE
+    return _gemini_module() is not None